@@ -1,9 +1,26 @@
-from .crew_ai_agent import (
-    call_crew_agent,
-)
-from .autogen_ai_agent import call_autogen_agent
+import importlib
+
+# The framework adapters are imported on first access, so a graph that only
+# uses one framework does not pay for importing the others.
+_LAZY_ATTRS = {
+    'call_crew_agent': '.crew_ai_agent',
+    'call_autogen_agent': '.autogen_ai_agent',
+    'acall_crew_agent': '.crew_ai_agent',
+    'acall_autogen_agent': '.autogen_ai_agent',
+}
 
 __all__ = [
     'call_crew_agent',
     'call_autogen_agent',
+    'acall_crew_agent',
+    'acall_autogen_agent',
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -1,46 +1,101 @@
-import autogen
 import os
-from langchain_core.messages import convert_to_openai_messages
+from typing import Optional
+from .context_window import ContextWindowManager
+from .executor import NODE_TIMEOUT, run_blocking, run_pooled, submit_blocking
+from .lazy import LazyResource
+from .message_cache import OpenAIMessageConverter
+from .pool import InstancePool
+from .streaming import STREAM_TOKENS, NodeMessageStream, autogen_token_iostream
 
 model_name = "gpt-4o-mini"
 
-config_list = [{"model": model_name, "api_key": os.environ["OPENAI_API_KEY"]}]
 
-llm_config = {
-    "timeout": 600,
-    "cache_seed": 42,
-    "config_list": config_list,
-    "temperature": 0,
-}
+def get_llm_config():
+    """Build the autogen llm config, reading OPENAI_API_KEY when called."""
+    from llm_cache import cached_http_client
 
-autogen_agent = autogen.AssistantAgent(
-    name="RecommendationGenerator",
-    llm_config=llm_config,
-    system_message="""
+    config_list = [{
+        "model": model_name,
+        "api_key": os.environ["OPENAI_API_KEY"],
+        # Responses are cached by the shared LLM response cache
+        "http_client": cached_http_client(),
+    }]
+
+    return {
+        "timeout": 600,
+        # autogen's own disk cache is replaced by the shared cache
+        "cache_seed": None,
+        "config_list": config_list,
+        "temperature": 0,
+    }
+
+
+def build_autogen_agents():
+    """Build the autogen assistant and user proxy agents.
+
+    autogen is imported here rather than at module load, so importing this
+    module stays cheap until the node actually runs.
+    """
+    import autogen
+
+    llm_config = get_llm_config()
+
+    autogen_agent = autogen.AssistantAgent(
+        name="RecommendationGenerator",
+        # only the recommendation is streamed, not the proxy's replies
+        llm_config={**llm_config, "stream": STREAM_TOKENS},
+        system_message="""
     I am a recommendation generator. Please provide me with the information I need to generate a recommendation.
     you will receive a user internet package details and usage data based on the user id. based on that you have to generate a recommendation.
     Reply TERMINATE if the task has been solved at full satisfaction. Otherwise, reply CONTINUE, or the reason why the task is not solved yet.
-    """,
-)
+        """,
+    )
+
+    user_proxy = autogen.UserProxyAgent(
+        name="user_proxy",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=10,
+        is_termination_msg=lambda x: x.get(
+            "content", "").rstrip().endswith("TERMINATE"),
+        code_execution_config={
+            "work_dir": "web",
+            "use_docker": False,
+        },  # Please set use_docker=True if docker is available to run the generated code. Using docker is safer than running the generated code directly.
+        llm_config=llm_config,
+        system_message="Reply TERMINATE if the task has been solved at full satisfaction. Otherwise, reply CONTINUE, or the reason why the task is not solved yet.",
+    )
+    return autogen_agent, user_proxy
 
 
-def test(query: str) -> str:
-    return "test"
+def reset_autogen_agents(agents) -> None:
+    """Clear the chat history both agents kept from their previous chat."""
+    for agent in agents:
+        agent.reset()
+
+
+_agents_pool = LazyResource(
+    lambda: InstancePool(build_autogen_agents, reset=reset_autogen_agents))
+
+
+def get_autogen_pool() -> InstancePool:
+    """Return the pool of (autogen_agent, user_proxy) pairs, pre-building them on first use."""
+    return _agents_pool.get()
+
 
+# Keeps the carryover of every thread within the token budget
+context_window = ContextWindowManager()
+# Converts only the messages that are new since the previous turn
+message_converter = OpenAIMessageConverter()
 
-user_proxy = autogen.UserProxyAgent(
-    name="user_proxy",
-    human_input_mode="NEVER",
-    max_consecutive_auto_reply=10,
-    is_termination_msg=lambda x: x.get(
-        "content", "").rstrip().endswith("TERMINATE"),
-    code_execution_config={
-        "work_dir": "web",
-        "use_docker": False,
-    },  # Please set use_docker=True if docker is available to run the generated code. Using docker is safer than running the generated code directly.
-    llm_config=llm_config,
-    system_message="Reply TERMINATE if the task has been solved at full satisfaction. Otherwise, reply CONTINUE, or the reason why the task is not solved yet.",
-)
+
+def _thread_id(config) -> Optional[str]:
+    if not config:
+        return None
+    return config.get("configurable", {}).get("thread_id")
+
+
+def test(query: str) -> str:
+    return "test"
 
 
 # result = autogen_agent.initiate_chat(
@@ -58,16 +113,58 @@ user_proxy = autogen.UserProxyAgent(
 # print(result.chat_history[-1]["content"])
 
 
-def call_autogen_agent(state: any):
+def _final_message(response, stream: NodeMessageStream):
+    # get the final response from the agent
+    content = response.chat_history[-1]["content"]
+    stream.finish(content)
+    # same id as the streamed chunks, so LangGraph does not emit it twice
+    return {"role": "assistant", "content": content, "id": stream.message_id}
+
+
+def call_autogen_agent(state: any, config: Optional[dict] = None):
     # convert to openai-style messages
     print("Starting call_autogen_agent...")
-    messages = convert_to_openai_messages(state["messages"])
-    response = user_proxy.initiate_chat(
-        autogen_agent,
-        message=messages[-1],
+    messages = message_converter.convert(_thread_id(config), state["messages"])
+    # previous history within the token budget, older turns summarized
+    carryover = context_window.build_carryover(_thread_id(config), messages[:-1])
+    # the assistant's tokens are streamed to the `messages` stream mode
+    with NodeMessageStream(config, "autogen") as stream, autogen_token_iostream():
+        with get_autogen_pool().lease() as (autogen_agent, user_proxy):
+            response = user_proxy.initiate_chat(
+                autogen_agent,
+                message=messages[-1],
+                # pass previous message history as context
+                carryover=carryover,
+            )
+        return {"messages": _final_message(response, stream)}
+
+
+async def acall_autogen_agent(state: any, config: Optional[dict] = None,
+                              timeout: Optional[float] = NODE_TIMEOUT):
+    """Async variant of call_autogen_agent
+
+    Uses ConversableAgent.a_initiate_chat when available and falls back to
+    the bounded framework executor otherwise. Either way the chat is
+    cancelled after `timeout` seconds, and agents whose chat may still be
+    running are discarded rather than returned to the pool.
+    """
+    print("Starting acall_autogen_agent...")
+    messages = message_converter.convert(_thread_id(config), state["messages"])
+    # summarizing may call the LLM, so it runs off the event loop
+    carryover = await run_blocking(
+        context_window.build_carryover, _thread_id(config), messages[:-1], timeout=timeout)
+    pool = await run_blocking(get_autogen_pool, timeout=timeout)
+    agents = await pool.acheckout(timeout)
+    autogen_agent, user_proxy = agents
+    chat_kwargs = {
+        "message": messages[-1],
         # pass previous message history as context
-        carryover=messages[:-1],
-    )
-    # get the final response from the agent
-    content = response.chat_history[-1]["content"]
-    return {"messages": {"role": "assistant", "content": content}}
+        "carryover": carryover,
+    }
+    with NodeMessageStream(config, "autogen") as stream, autogen_token_iostream():
+        if hasattr(user_proxy, "a_initiate_chat"):
+            call = user_proxy.a_initiate_chat(autogen_agent, **chat_kwargs)
+        else:
+            call = submit_blocking(user_proxy.initiate_chat, autogen_agent, **chat_kwargs)
+        response = await run_pooled(pool, agents, call, timeout)
+        return {"messages": _final_message(response, stream)}
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# Token budget of the carryover passed to autogen on every call
+CARRYOVER_TOKEN_BUDGET = int(os.environ.get("AUTOGEN_CARRYOVER_TOKENS", "3000"))
+
+Message = Dict[str, str]
+Summarizer = Callable[[str, List[Message]], str]
+
+
+def approx_token_count(message: Message) -> int:
+    """Cheap token estimate: ~4 characters per token plus message overhead."""
+    return len(str(message.get("content") or "")) // 4 + 4
+
+
+def _fingerprint(message: Message) -> str:
+    text = f"{message.get('role')}\0{message.get('content')}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def llm_summarizer(model_name: str = "gpt-4o-mini") -> Summarizer:
+    """Return a summarizer that folds new turns into a summary with an LLM."""
+    model = None
+
+    def summarize(previous_summary: str, messages: List[Message]) -> str:
+        nonlocal model
+        if model is None:
+            from langchain_openai import ChatOpenAI
+            from llm_cache import cached_client_kwargs
+            model = ChatOpenAI(model=model_name, temperature=0, **cached_client_kwargs())
+        transcript = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in messages)
+        prompt = (
+            "Update the summary of a conversation with the new turns below. "
+            "Keep facts, ids, numbers and decisions; drop small talk.\n\n"
+            f"Current summary:\n{previous_summary or '(empty)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+        return model.invoke(prompt).content
+
+    return summarize
+
+
+@dataclass
+class _ThreadSummary:
+    # number of leading messages folded into the summary
+    boundary: int = 0
+    summary: str = ""
+    # fingerprint of the last summarized message, to detect edited history
+    last_fingerprint: str = ""
+
+
+class ContextWindowManager:
+    """Keep autogen carryover within a token budget.
+
+    Recent turns are kept verbatim as long as they fit in `token_budget`.
+    Older turns are folded into a rolling summary that is memoized per
+    thread. The summary boundary only moves forward, so each turn summarizes
+    only the messages that just fell out of the window. If the history
+    shrinks below the summary boundary, or the last summarized message
+    changes, the thread's summary is rebuilt.
+
+    Args:
+        token_budget: Maximum tokens of verbatim messages in the carryover
+        summarizer: Folds new messages into a previous summary, defaults to
+            llm_summarizer()
+        count_tokens: Returns the token count of a single message
+        max_threads: Number of thread summaries kept, least recently used
+            threads are dropped first
+    """
+
+    def __init__(self, token_budget: int = CARRYOVER_TOKEN_BUDGET,
+                 summarizer: Optional[Summarizer] = None,
+                 count_tokens: Callable[[Message], int] = approx_token_count,
+                 max_threads: int = 10_000):
+        self.token_budget = token_budget
+        self._summarizer = summarizer
+        self._count_tokens = count_tokens
+        self._max_threads = max_threads
+        self._threads: "OrderedDict[str, _ThreadSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _summarize(self, previous_summary: str, messages: List[Message]) -> str:
+        if self._summarizer is None:
+            self._summarizer = llm_summarizer()
+        return self._summarizer(previous_summary, messages)
+
+    def _thread_state(self, thread_id: Optional[str]) -> _ThreadSummary:
+        if thread_id is None:
+            return _ThreadSummary()
+        with self._lock:
+            state = self._threads.get(thread_id)
+            if state is None:
+                state = self._threads[thread_id] = _ThreadSummary()
+                while len(self._threads) > self._max_threads:
+                    self._threads.popitem(last=False)
+            else:
+                self._threads.move_to_end(thread_id)
+            return state
+
+    def build_carryover(self, thread_id: Optional[str], messages: List[Message]) -> List[Message]:
+        """Return the carryover for `messages` (the history before the new message).
+
+        Args:
+            thread_id: Conversation id the summary is memoized under, None
+                disables memoization
+            messages: OpenAI-style messages, oldest first
+
+        Returns:
+            An optional summary message followed by the recent messages
+        """
+        state = self._thread_state(thread_id)
+
+        # Reset when the summarized part of the history was edited or removed
+        if state.boundary and (
+                len(messages) < state.boundary
+                or _fingerprint(messages[state.boundary - 1]) != state.last_fingerprint):
+            state.boundary, state.summary, state.last_fingerprint = 0, "", ""
+
+        # Walk back from the newest message while the budget allows
+        start = len(messages)
+        used = 0
+        while start > state.boundary:
+            cost = self._count_tokens(messages[start - 1])
+            if used + cost > self.token_budget:
+                break
+            used += cost
+            start -= 1
+
+        if start > state.boundary:
+            state.summary = self._summarize(state.summary, messages[state.boundary:start])
+            state.boundary = start
+            state.last_fingerprint = _fingerprint(messages[start - 1])
+
+        carryover = list(messages[state.boundary:])
+        if state.summary:
+            carryover.insert(0, {
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {state.summary}",
+            })
+        return carryover
+
+    def forget(self, thread_id: str) -> None:
+        """Drop the memoized summary of a thread."""
+        with self._lock:
+            self._threads.pop(thread_id, None)
@@ -1,14 +1,18 @@
-from copy import deepcopy
 import os
-from crewai import Agent, Task, Crew
 import logging
+from typing import Optional
 from langchain_core.messages import convert_to_openai_messages, AIMessage
-from crewai.tools import tool
+from .executor import NODE_TIMEOUT, run_blocking, run_pooled, submit_blocking
+from .lazy import LazyResource
+from .pool import InstancePool
+from .streaming import STREAM_TOKENS, NodeMessageStream, crew_stream_events
+from tool_cache import cached_tool
 model_name = "gpt-4o-mini"
 # crewai agents
 
 
-@tool("search on internet")
+# Package details change rarely, so repeated lookups are served from cache
+@cached_tool(ttl=300)
 def search_on_internet(userId: str) -> str:
     """using this tool you can get users internent package details based on the user id
 
@@ -31,61 +35,123 @@ def search_on_internet(userId: str) -> str:
     """
 
 
-researcher = Agent(
-    role="Usage Analyzer",
-    goal="you should be able to find user interent package info and usage data based on the user id",
-    backstory="once you got user id you will use the necssaery tool and get user usage data. You know when you have enough information to complete your task.",
-    verbose=True,
-    allow_delegation=False,
-    tools=[search_on_internet],
-    llm_model=model_name,
-    # Add max iterations to prevent infinite loops
-    max_iter=3
-)
-
-# Define tasks
-research_task = Task(
-    description="Analyze the usage data of a user based on the user id.",
-    agent=researcher,
-    expected_output="The user's internet package details and usage data in json format nothing else",
-)
-
-# Define crew
-crew = Crew(
-    agents=[researcher],
-    tasks=[research_task],
-    verbose=True,
-    # Add a specific process to make execution more predictable
-    process="sequential"
-)
-
-
-def call_crew_agent(state: any):
-    """Node function for the agent"""
-    print("Starting call_crew_agent...")
-    state_clone = deepcopy(state["messages"])
-    messages = convert_to_openai_messages(state["messages"])
-    topic = messages[-1]
-    print(f"CrewAI topic: {topic}")
-    crew_response = "this test msg"
-    # Invoke the crew
-    print("Invoking CrewAI...")
-    result = crew.kickoff(inputs={'topic': topic})
-    print(f"CrewAI result type: {type(result)}")
+def build_crew():
+    """Build the CrewAI agent, task and crew.
+
+    crewai is imported here rather than at module load, so importing this
+    module stays cheap until the node actually runs.
+    """
+    from crewai import Agent, Task, Crew, LLM
+    from crewai.tools import tool
+    from llm_cache import install_litellm_cache
+
+    # CrewAI calls OpenAI through litellm
+    install_litellm_cache()
+    # Streamed tokens are forwarded to the node's message stream
+    crew_stream_events.get()
+
+    researcher = Agent(
+        role="Usage Analyzer",
+        goal="you should be able to find user interent package info and usage data based on the user id",
+        backstory="once you got user id you will use the necssaery tool and get user usage data. You know when you have enough information to complete your task.",
+        verbose=True,
+        allow_delegation=False,
+        tools=[tool("search on internet")(search_on_internet)],
+        llm=LLM(model=model_name, stream=STREAM_TOKENS),
+        # Add max iterations to prevent infinite loops
+        max_iter=3
+    )
+
+    # Define tasks
+    research_task = Task(
+        description="Analyze the usage data of a user based on the user id.",
+        agent=researcher,
+        expected_output="The user's internet package details and usage data in json format nothing else",
+    )
+
+    # Define crew
+    return Crew(
+        agents=[researcher],
+        tasks=[research_task],
+        verbose=True,
+        # Add a specific process to make execution more predictable
+        process="sequential"
+    )
+
+
+def reset_crew(crew) -> None:
+    """Clear the outputs a crew kept from its previous kickoff."""
+    for task in crew.tasks:
+        task.output = None
+
+
+_crew_pool = LazyResource(lambda: InstancePool(build_crew, reset=reset_crew))
+
 
+def get_crew_pool() -> InstancePool:
+    """Return the crew pool, pre-building its crews on first use."""
+    return _crew_pool.get()
+
+
+def _crew_topic(state: any):
+    # only the latest message is used as the crew's topic
+    return convert_to_openai_messages(state["messages"][-1])
+
+
+def _crew_message(result, stream: NodeMessageStream) -> AIMessage:
     # Add the crew's response to the messages
     if isinstance(result, str):
         crew_response = result
     else:
         # Handle other result types
-        crew_response = str(result) 
-
-    state_clone.append(AIMessage(content=crew_response))
+        crew_response = str(result)
     print(f"CrewAI response (truncated): {crew_response[:100]}...")
-    state["messages"] = state_clone
+    stream.finish(crew_response)
+    # same id as the streamed chunks, so LangGraph does not emit it twice
+    return AIMessage(content=crew_response, id=stream.message_id)
+
+
+def call_crew_agent(state: any, config: Optional[dict] = None):
+    """Node function for the agent
+
+    Only the new AIMessage is returned; the graph's add_messages reducer
+    appends it to the history, so the cost per turn does not grow with the
+    length of the conversation. Tokens of the crew's LLM calls are streamed
+    to the `messages` stream mode while the crew runs.
+    """
+    print("Starting call_crew_agent...")
+    topic = _crew_topic(state)
+    print(f"CrewAI topic: {topic}")
+    # Invoke the crew
+    print("Invoking CrewAI...")
+    with NodeMessageStream(config, "crewai") as stream:
+        with get_crew_pool().lease() as crew:
+            result = crew.kickoff(inputs={'topic': topic})
+        print(f"CrewAI result type: {type(result)}")
+        message = _crew_message(result, stream)
     print("Finished call_crew_agent")
-    return {"messages": state["messages"]}
+    return {"messages": [message]}
 
 
+async def acall_crew_agent(state: any, config: Optional[dict] = None,
+                           timeout: Optional[float] = NODE_TIMEOUT):
+    """Async node function for the agent
 
-Agent
+    Uses Crew.kickoff_async when the installed crewai provides it and falls
+    back to the bounded framework executor otherwise. Either way the call is
+    cancelled after `timeout` seconds, and a crew whose kickoff may still be
+    running is discarded rather than returned to the pool.
+    """
+    print("Starting acall_crew_agent...")
+    topic = _crew_topic(state)
+    pool = await run_blocking(get_crew_pool, timeout=timeout)
+    crew = await pool.acheckout(timeout)
+    with NodeMessageStream(config, "crewai") as stream:
+        if hasattr(crew, "kickoff_async"):
+            call = crew.kickoff_async(inputs={'topic': topic})
+        else:
+            call = submit_blocking(crew.kickoff, inputs={'topic': topic})
+        result = await run_pooled(pool, crew, call, timeout)
+        message = _crew_message(result, stream)
+    print("Finished acall_crew_agent")
+    return {"messages": [message]}
@@ -0,0 +1,58 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+from .lazy import LazyResource
+from .pool import InstancePool
+
+# Upper bound on blocking framework calls running at the same time
+MAX_BLOCKING_WORKERS = int(os.environ.get("AGENT_FRAMEWORK_WORKERS", "16"))
+# Default time a framework node may take before it is cancelled
+NODE_TIMEOUT = float(os.environ.get("AGENT_FRAMEWORK_TIMEOUT", "300"))
+
+_executor = LazyResource(lambda: ThreadPoolExecutor(
+    max_workers=MAX_BLOCKING_WORKERS, thread_name_prefix="agent-framework"))
+
+
+def submit_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+    """Start a blocking framework call on the bounded executor and return its future.
+
+    The call runs in a copy of the caller's context, so context variables
+    such as the node's message stream are visible to it.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return loop.run_in_executor(_executor.get(), lambda: context.run(func, *args, **kwargs))
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any,
+                       timeout: Optional[float] = NODE_TIMEOUT, **kwargs: Any) -> Any:
+    """Run a blocking framework call on the bounded executor.
+
+    The event loop is never blocked. On timeout or cancellation, a call that
+    is still queued is dropped. A call that already started keeps its worker
+    thread until it returns, because threads cannot be interrupted.
+    """
+    return await asyncio.wait_for(submit_blocking(func, *args, **kwargs), timeout)
+
+
+async def run_pooled(pool: InstancePool, instance: Any, call: Awaitable[Any],
+                     timeout: Optional[float] = NODE_TIMEOUT) -> Any:
+    """Await a call that uses a pooled instance, then give the instance back.
+
+    The instance is checked in only after the call has finished. A call that
+    timed out or was cancelled may still be running on a worker thread and
+    mutating the instance, so the instance is discarded instead and the pool
+    builds a replacement.
+    """
+    future = asyncio.ensure_future(call)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    finally:
+        if future.done() and not future.cancelled():
+            pool.checkin(instance)
+        else:
+            future.cancel()
+            pool.discard(instance)
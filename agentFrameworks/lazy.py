@@ -0,0 +1,36 @@
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyResource(Generic[T]):
+    """Build a value on first use.
+
+    The builder runs at most once, even when several graph threads ask for
+    the value at the same time.
+    """
+
+    def __init__(self, builder: Callable[[], T]):
+        self._builder = builder
+        self._value = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def get(self) -> T:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self._builder()
+                    self._built = True
+        return self._value
+
+    def reset(self) -> None:
+        """Drop the built value so the next get() builds a new one."""
+        with self._lock:
+            self._value = None
+            self._built = False
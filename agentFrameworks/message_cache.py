@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, convert_to_openai_messages
+
+
+def _fingerprint(message: BaseMessage) -> Tuple:
+    # Changes whenever a message with the same id is edited. Compared by
+    # equality; mutable parts are kept as their repr.
+    content = message.content
+    tool_calls = message.tool_calls if isinstance(message, AIMessage) else None
+    return (
+        message.id,
+        message.type,
+        content if isinstance(content, str) else repr(content),
+        repr(tool_calls) if tool_calls else None,
+    )
+
+
+class _ThreadConversion:
+    """Converted history of one thread."""
+
+    __slots__ = ("converted", "fingerprints")
+
+    def __init__(self):
+        self.converted: List[Dict[str, Any]] = []
+        # id and content fingerprint of the message behind each converted dict
+        self.fingerprints: List[Tuple] = []
+
+
+class OpenAIMessageConverter:
+    """Convert message history to OpenAI format incrementally.
+
+    The converted history of each thread is kept, so a turn only converts
+    the messages appended since the previous turn. Every converted message
+    is remembered by its id and a fingerprint of its content, so when a
+    message was edited, removed or inserted (e.g. by add_messages with an
+    existing id or RemoveMessage), the history is converted again from the
+    first position that changed. Calls without a thread id are converted
+    without caching.
+
+    The returned list is new on every call, but its dicts are shared with
+    the cache and must not be modified.
+
+    Args:
+        max_threads: Number of threads kept, least recently used threads are
+            dropped first
+    """
+
+    def __init__(self, max_threads: int = 10_000):
+        self._max_threads = max_threads
+        self._threads: "OrderedDict[str, _ThreadConversion]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.converted = 0
+        self.reused = 0
+
+    def _thread_state(self, thread_id: str) -> _ThreadConversion:
+        with self._lock:
+            state = self._threads.get(thread_id)
+            if state is None:
+                state = self._threads[thread_id] = _ThreadConversion()
+                while len(self._threads) > self._max_threads:
+                    self._threads.popitem(last=False)
+            else:
+                self._threads.move_to_end(thread_id)
+            return state
+
+    def convert(self, thread_id: Optional[str], messages: List[BaseMessage]) -> List[Dict[str, Any]]:
+        """Return `messages` in OpenAI format, converting only the new tail."""
+        if thread_id is None:
+            return convert_to_openai_messages(messages)
+
+        state = self._thread_state(thread_id)
+        # Keep the converted prefix up to the first edited, removed or inserted message
+        fingerprints = [_fingerprint(message) for message in messages]
+        kept = min(len(state.fingerprints), len(fingerprints))
+        if fingerprints[:kept] != state.fingerprints[:kept]:
+            kept = next(i for i, (new, old) in enumerate(zip(fingerprints, state.fingerprints))
+                        if new != old)
+        del state.converted[kept:]
+        state.fingerprints = fingerprints
+
+        tail = messages[kept:]
+        if tail:
+            state.converted.extend(convert_to_openai_messages(tail))
+        self.converted += len(tail)
+        self.reused += kept
+        return list(state.converted)
+
+    def forget(self, thread_id: str) -> None:
+        """Drop the cached conversions of a thread."""
+        with self._lock:
+            self._threads.pop(thread_id, None)
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Number of pre-built framework instances per pool
+POOL_SIZE = int(os.environ.get("AGENT_FRAMEWORK_POOL_SIZE", "4"))
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when no instance could be checked out in time."""
+
+
+# Queued in place of a discarded instance; checkout() builds a new one for it
+_REPLACE = object()
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class InstancePool(Generic[T]):
+    """Pool of pre-built framework instances.
+
+    Every instance is used by one conversation at a time: checkout() hands out
+    an idle instance and checkin() resets it and makes it available again. An
+    instance whose reset fails is replaced by a freshly built one, and so is
+    an instance given up with discard().
+
+    acheckout() is the event-loop variant of checkout(): it waits without
+    holding a thread, so a caller that gives up never leaves a thread behind
+    that would take an instance later.
+
+    Args:
+        builder: Builds a new instance
+        size: Number of instances, all built when the pool is created
+        reset: Clears the per-conversation state of a returned instance
+    """
+
+    def __init__(self, builder: Callable[[], T], size: int = POOL_SIZE,
+                 reset: Optional[Callable[[T], None]] = None):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self._builder = builder
+        self._reset = reset
+        self.size = size
+        self._idle: "queue.LifoQueue[T]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.replaced = 0
+        # (loop, future) of acheckout() calls waiting for an instance
+        self._async_waiters: List[tuple] = []
+        for _ in range(size):
+            self._idle.put(builder())
+
+    def checkout(self, timeout: Optional[float] = None) -> T:
+        """Take an idle instance, waiting up to `timeout` seconds for one."""
+        started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        try:
+            instance = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No instance available after {timeout} seconds")
+        finally:
+            waited = time.perf_counter() - started
+            with self._lock:
+                self.waiting -= 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+        if instance is _REPLACE:
+            try:
+                instance = self._builder()
+            except Exception:
+                # keep the slot, the next checkout tries again
+                self._put(_REPLACE)
+                raise
+        with self._lock:
+            self.checkouts += 1
+        return instance
+
+    async def acheckout(self, timeout: Optional[float] = None) -> T:
+        """Take an idle instance without blocking the event loop.
+
+        Waits up to `timeout` seconds for an instance. Nothing is taken from
+        the pool until one is available, so a call that times out or is
+        cancelled leaves the pool as it was. A discarded instance is rebuilt
+        on a worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                waiter = loop.create_future()
+                with self._lock:
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    instance = self._idle.get_nowait()
+                    break
+                except queue.Empty:
+                    pass
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No instance available after {timeout} seconds")
+                try:
+                    await asyncio.wait_for(waiter, remaining)
+                except asyncio.TimeoutError:
+                    raise PoolTimeout(f"No instance available after {timeout} seconds") from None
+                finally:
+                    self._remove_waiter(waiter)
+        finally:
+            self._remove_waiter(waiter)
+            waited = time.perf_counter() - started
+            with self._lock:
+                self.waiting -= 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+        if instance is _REPLACE:
+            build = loop.run_in_executor(None, self._builder)
+            try:
+                instance = await asyncio.shield(build)
+            except asyncio.CancelledError:
+                # the caller is gone, pool whatever the build produces
+                build.add_done_callback(self._pool_build)
+                raise
+            except Exception:
+                self._put(_REPLACE)
+                raise
+        with self._lock:
+            self.checkouts += 1
+        return instance
+
+    def _pool_build(self, build: "asyncio.Future[T]") -> None:
+        failed = build.cancelled() or build.exception() is not None
+        self._put(_REPLACE if failed else build.result())
+
+    def _remove_waiter(self, waiter: "asyncio.Future[None]") -> None:
+        with self._lock:
+            self._async_waiters = [w for w in self._async_waiters if w[1] is not waiter]
+
+    def _put(self, instance: T) -> None:
+        """Make an instance (or replacement slot) available and wake async waiters."""
+        self._idle.put(instance)
+        with self._lock:
+            waiters, self._async_waiters = self._async_waiters, []
+        # every waiter retries, the ones that lose the race wait again
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def checkin(self, instance: T) -> None:
+        """Reset an instance and return it to the pool."""
+        if self._reset is not None:
+            try:
+                self._reset(instance)
+            except Exception:
+                logger.exception("Resetting a pooled instance failed, replacing it")
+                instance = self._builder()
+                with self._lock:
+                    self.replaced += 1
+        self._put(instance)
+
+    def discard(self, instance: T) -> None:
+        """Give up an instance that must not be reused.
+
+        Used when a call on the instance may still be running, e.g. after a
+        timeout. The replacement is built by the next checkout that needs it.
+        """
+        with self._lock:
+            self.replaced += 1
+        self._put(_REPLACE)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[T]:
+        """Check out an instance for the duration of a with block."""
+        instance = self.checkout(timeout)
+        try:
+            yield instance
+        finally:
+            self.checkin(instance)
+
+    def metrics(self) -> Dict[str, float]:
+        """Return pool size, usage and wait-time metrics."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "available": self._idle.qsize(),
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "replaced": self.replaced,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
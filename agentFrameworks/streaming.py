@@ -0,0 +1,146 @@
+import contextvars
+import os
+import uuid
+from typing import Any, Optional
+
+from .lazy import LazyResource
+
+# Set AGENT_FRAMEWORK_STREAM=off to let the framework LLMs answer in one piece
+# (streamed completions bypass the shared LLM response cache)
+STREAM_TOKENS = os.environ.get("AGENT_FRAMEWORK_STREAM", "on").lower() != "off"
+
+# Stream of the framework node running in the current context
+_current_stream: contextvars.ContextVar[Optional["NodeMessageStream"]] = \
+    contextvars.ContextVar("agent_framework_message_stream", default=None)
+
+
+class NodeMessageStream:
+    """Report tokens of a CrewAI or autogen node to LangGraph's `messages` stream.
+
+    LangGraph only sees tokens of LangChain chat models. This opens a chat
+    model run on the node's callbacks, so tokens pushed with `token()` reach
+    the `messages` stream mode as AIMessageChunks, the same way react agent
+    tokens do. All chunks carry `message_id`. The node returns its final
+    message with that id, so LangGraph does not emit it a second time.
+
+    Use it as a context manager around the framework call. Inside the block,
+    `current_stream()` returns it, including in worker threads started with
+    `run_blocking` or `asyncio.to_thread`. Without a config, or when
+    streaming is off, it is a no-op.
+
+    Args:
+        config: RunnableConfig passed to the node
+        name: Name of the run, shown as the model that produced the chunks
+    """
+
+    def __init__(self, config: Optional[dict], name: str):
+        self.config = config
+        self.name = name
+        self.message_id = f"run-{uuid.uuid4()}"
+        self._run_manager = None
+        self._token = None
+
+    def __enter__(self) -> "NodeMessageStream":
+        if self.config and STREAM_TOKENS:
+            from langchain_core.messages import HumanMessage
+            from langchain_core.runnables.config import get_callback_manager_for_config
+
+            manager = get_callback_manager_for_config(self.config)
+            self._run_manager = manager.on_chat_model_start(
+                {"name": self.name}, [[HumanMessage(content="")]], name=self.name)[0]
+        self._token = _current_stream.set(self)
+        return self
+
+    def token(self, text: str) -> None:
+        """Emit one token as an AIMessageChunk."""
+        if self._run_manager is None or not text:
+            return
+        from langchain_core.messages import AIMessageChunk
+        from langchain_core.outputs import ChatGenerationChunk
+
+        chunk = ChatGenerationChunk(message=AIMessageChunk(content=text, id=self.message_id))
+        self._run_manager.on_llm_new_token(text, chunk=chunk)
+
+    def finish(self, content: str) -> None:
+        """Close the run with the node's final answer."""
+        if self._run_manager is None:
+            return
+        from langchain_core.messages import AIMessage
+        from langchain_core.outputs import ChatGeneration, LLMResult
+
+        message = AIMessage(content=content, id=self.message_id)
+        self._run_manager.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+        self._run_manager = None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_stream.reset(self._token)
+        if self._run_manager is not None and exc is not None:
+            self._run_manager.on_llm_error(exc)
+            self._run_manager = None
+
+
+def current_stream() -> Optional[NodeMessageStream]:
+    """Return the stream of the node running in this context, if any."""
+    return _current_stream.get()
+
+
+def crew_stream_handler(source: Any, event: Any) -> None:
+    """crewai event bus handler forwarding LLMStreamChunkEvents to the node stream."""
+    stream = current_stream()
+    if stream is not None:
+        stream.token(event.chunk)
+
+
+def _install_crew_stream_handler() -> bool:
+    try:
+        from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+    except ImportError:
+        try:
+            from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+        except ImportError:
+            # crewai without stream events: the node answers in one piece
+            return False
+    crewai_event_bus.on(LLMStreamChunkEvent)(crew_stream_handler)
+    return True
+
+
+# The event bus is process-wide, so the handler is registered only once
+crew_stream_events = LazyResource(_install_crew_stream_handler)
+
+
+class AutogenTokenIOStream:
+    """autogen IOStream forwarding streamed completion tokens to the node stream.
+
+    autogen sends every streamed chunk as a StreamMessage, whose content
+    becomes a token; older releases print it with `print(content, end="",
+    flush=True)`, which is turned into a token as well. Everything else goes
+    to the wrapped stream.
+    """
+
+    def __init__(self, inner: Any):
+        self.inner = inner
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", flush: bool = False) -> None:
+        stream = current_stream()
+        if stream is not None and end == "" and flush:
+            stream.token(sep.join(str(o) for o in objects))
+        else:
+            self.inner.print(*objects, sep=sep, end=end, flush=flush)
+
+    def send(self, message: Any) -> None:
+        stream = current_stream()
+        # StreamMessage is wrapped by autogen: type "stream", the chunk in content.content
+        if stream is not None and getattr(message, "type", None) == "stream":
+            stream.token(message.content.content)
+        else:
+            self.inner.send(message)
+
+    def input(self, prompt: str = "", *, password: bool = False) -> str:
+        return self.inner.input(prompt, password=password)
+
+
+def autogen_token_iostream():
+    """Context manager routing autogen's output through AutogenTokenIOStream."""
+    from autogen.io.base import IOStream
+
+    return IOStream.set_default(AutogenTokenIOStream(IOStream.get_default()))
@@ -0,0 +1,153 @@
+"""
+Agent Batch Generator Module
+
+This module generates agent code for a JSONL file of agent specs (one job per
+line). Lines are streamed from disk in chunks, rendered on a process pool and
+written back as JSONL in input order. Only a bounded number of chunks is in
+flight at any time, so memory does not grow with the size of the input.
+
+Usage:
+    poetry run python agent_batch_generator.py specs.jsonl generated.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from agent_factory import generate_agent_code
+
+
+def _job_config(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the agent configuration of a job line.
+
+    A line may either be a full document with an "agent" key (the shape
+    accepted by parse_agent_json) or the agent configuration itself.
+    """
+    if isinstance(job.get("agent"), dict):
+        return job["agent"]
+    return job
+
+
+def process_line(line_no: int, line: str) -> Dict[str, Any]:
+    """
+    Generate code for a single JSONL line.
+
+    Args:
+        line_no: 1-based line number in the input file
+        line: Raw JSON text of the line
+
+    Returns:
+        A result record with either a "code" or an "error" field
+    """
+    record: Dict[str, Any] = {"line": line_no}
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError("Each line must be a JSON object")
+        for id_key in ("id", "request_id"):
+            if id_key in job:
+                record["id"] = job[id_key]
+                break
+        record["code"] = generate_agent_code(_job_config(job))
+    except json.JSONDecodeError as e:
+        record["error"] = f"Invalid JSON: {e}"
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def _process_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    return [process_line(line_no, line) for line_no, line in chunk]
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    numbered = ((i, line) for i, line in enumerate(lines, start=1) if line.strip())
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write(records: List[Dict[str, Any]], output: TextIO, summary: Dict[str, int]) -> None:
+    for record in records:
+        output.write(json.dumps(record) + "\n")
+        summary["total"] += 1
+        summary["errors" if "error" in record else "ok"] += 1
+
+
+def generate_batch_stream(
+    lines: Iterable[str],
+    output: TextIO,
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    max_pending: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Generate code for a stream of JSONL lines and write JSONL results.
+
+    Args:
+        lines: Iterable of JSONL lines (e.g. an open file)
+        output: Text stream the result records are written to
+        workers: Number of worker processes, 0 runs in the current process
+        chunk_size: Number of lines sent to a worker at once
+        max_pending: Maximum number of chunks in flight, defaults to 2 * workers
+
+    Returns:
+        Summary with total, ok and errors counts
+    """
+    summary = {"total": 0, "ok": 0, "errors": 0}
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    if workers == 0:
+        for chunk in _chunks(lines, chunk_size):
+            _write(_process_chunk(chunk), output, summary)
+        return summary
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(pool.submit(_process_chunk, chunk))
+            if len(pending) >= max_pending:
+                _write(pending.popleft().result(), output, summary)
+        while pending:
+            _write(pending.popleft().result(), output, summary)
+    return summary
+
+
+def generate_batch(input_path: str, output_path: str, **kwargs: Any) -> Dict[str, int]:
+    """
+    Generate code for every spec in a JSONL file.
+
+    Args:
+        input_path: Path of the JSONL file with one agent spec per line
+        output_path: Path of the JSONL file to write results to
+        **kwargs: Passed through to generate_batch_stream
+
+    Returns:
+        Summary with total, ok and errors counts
+    """
+    with open(input_path, "r", encoding="utf-8") as src, \
+            open(output_path, "w", encoding="utf-8") as dst:
+        return generate_batch_stream(src, dst, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate agent code for a JSONL file of specs")
+    parser.add_argument("input", help="JSONL file with one agent spec per line")
+    parser.add_argument("output", help="JSONL file to write the results to")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (0 = run in process)")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    result = generate_batch(args.input, args.output,
+                            workers=args.workers, chunk_size=args.chunk_size)
+    print(f"Processed {result['total']} specs: {result['ok']} ok, {result['errors']} errors")
@@ -0,0 +1,224 @@
+"""
+Agent Code Service Module
+
+This module wraps generate_agent_code in an asyncio service. Identical agent
+configs that arrive while a generation for the same config is still running
+are collapsed into that single computation, and every client on the event
+loop is answered from its result.
+
+The service can be used in process (AgentCodeService.generate) or served over
+TCP with a newline-delimited JSON protocol:
+
+    request:  {"agent": {...}}       or {"op": "metrics"}
+    response: {"code": "..."}        or {"error": "..."} or {"metrics": {...}}
+
+Usage:
+    poetry run python agent_code_service.py --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional
+
+from agent_factory import config_hash, generate_agent_code
+
+MAX_LATENCY_SAMPLES = 10_000
+# Longest request or response line; prompts and generated files exceed
+# asyncio's 64 KiB default
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+async def read_line(reader: asyncio.StreamReader) -> bytes:
+    """
+    Read one newline-terminated line, or what is left before EOF.
+
+    Raises:
+        ValueError: If the line is longer than the reader's limit; the rest
+            of the line is discarded so the connection can be used again
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            break
+        except asyncio.IncompleteReadError:
+            break
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+    raise ValueError("Line too long")
+
+
+class AgentCodeService:
+    """
+    Asyncio front end for agent code generation with request coalescing.
+
+    Args:
+        generate: Function rendering an agent config, defaults to
+            generate_agent_code
+        executor: Executor the rendering runs on, defaults to the loop's
+            default thread pool
+    """
+
+    def __init__(self, generate: Callable[[Dict[str, Any]], str] = generate_agent_code,
+                 executor: Optional[Executor] = None):
+        self._generate = generate
+        self._executor = executor
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._latencies: deque = deque(maxlen=MAX_LATENCY_SAMPLES)
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.computations = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def generate(self, agent_config: Dict[str, Any]) -> str:
+        """
+        Generate code for an agent config, sharing in-flight computations.
+
+        Args:
+            agent_config: Dictionary containing agent configuration
+
+        Returns:
+            String representation of the generated agent code
+
+        Raises:
+            ValueError: If the framework is not specified or not supported
+        """
+        started = time.perf_counter()
+        self.requests += 1
+        key = config_hash(agent_config)
+        future = self._inflight.get(key)
+        try:
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._generate, agent_config)
+                self.computations += 1
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shield so one cancelled client does not cancel the shared work
+            return await asyncio.shield(future)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return request counters, throughput and latency percentiles."""
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        elapsed = time.perf_counter() - self._started
+        return {
+            "requests": self.requests,
+            "computations": self.computations,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+            "requests_per_sec": self.requests / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+        }
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Serve newline-delimited JSON requests from one connection."""
+        try:
+            while True:
+                try:
+                    line = await read_line(reader)
+                except ValueError as e:
+                    response = {"error": str(e)}
+                else:
+                    if not line:
+                        break
+                    response = await self._handle_line(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_line(self, line: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(line)
+            if request.get("op") == "metrics":
+                return {"metrics": self.metrics()}
+            return {"code": await self.generate(request.get("agent", request))}
+        except json.JSONDecodeError:
+            return {"error": "Invalid JSON string"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765,
+                    limit: int = MAX_LINE_BYTES) -> asyncio.AbstractServer:
+        """Start serving on host:port, accepting lines of up to limit bytes."""
+        return await asyncio.start_server(self.handle_client, host, port, limit=limit)
+
+
+class AgentCodeClient:
+    """Minimal client for a running AgentCodeService."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 limit: int = MAX_LINE_BYTES):
+        self.host = host
+        self.port = port
+        self.limit = limit
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def __aenter__(self) -> "AgentCodeClient":
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, limit=self.limit)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def _request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._writer.write(json.dumps(payload).encode() + b"\n")
+        await self._writer.drain()
+        return json.loads(await read_line(self._reader))
+
+    async def generate(self, agent_config: Dict[str, Any]) -> str:
+        """Request code for an agent config, raising ValueError on errors."""
+        response = await self._request({"agent": agent_config})
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["code"]
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Return the service metrics."""
+        return (await self._request({"op": "metrics"}))["metrics"]
+
+
+async def _main(host: str, port: int) -> None:
+    service = AgentCodeService()
+    server = await service.serve(host, port)
+    print(f"Serving agent code generation on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent code generation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(_main(args.host, args.port))
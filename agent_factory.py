@@ -6,8 +6,19 @@ different frameworks (crewAI, Pydantic AI, etc.) from user input specifications.
 """
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from types import CodeType
 from typing import Dict, List, Any, Optional
+import hashlib
+import importlib
+import importlib.util
 import json
+import marshal
+import os
+import tempfile
+import textwrap
+import threading
 
 
 class AgentFactory(ABC):
@@ -18,6 +29,10 @@ class AgentFactory(ABC):
         """
         Create agent code based on the configuration.
 
+        Setting "lazyInit" in the configuration generates code that defers
+        imports and agent construction until get_agent() is first called,
+        so importing the generated module stays cheap.
+
         Args:
             agent_config: Dictionary containing agent configuration
 
@@ -43,6 +58,34 @@ class CrewAIAgentFactory(AgentFactory):
 
         tools_str = ", ".join([f'"{tool}"' for tool in tools])
 
+        if agent_config.get("lazyInit"):
+            return f'''
+import threading
+
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_agent():
+    """Build the CrewAI agent on first use (thread-safe)."""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                from crewai import Agent
+
+                _agent = Agent(
+                    role="{role}",
+                    goal="{expected_output}",
+                    backstory="{system_prompt}",
+                    verbose=True,
+                    allow_delegation=False,
+                    llm="{model}",
+                    tools=[{tools_str}]
+                )
+    return _agent
+'''
+
         code = f'''
 from crewai import Agent
 
@@ -94,6 +137,46 @@ def {tool}(query: str) -> str:
     return f"Result for {{query}} using {tool}"
 '''
 
+        if agent_config.get("lazyInit"):
+            register_code = textwrap.indent(tools_code, "    ") if tools else "    pass\n"
+            return f'''
+import threading
+
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def _register_tools(agent):
+{register_code}
+
+def get_agent():
+    """Load the environment and build the agent on first use (thread-safe)."""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                from dotenv import load_dotenv
+                from pydantic_ai import Agent
+
+                load_dotenv()
+                agent = Agent(
+                    "{model}",
+                    system_prompt="{system_prompt}"
+                )
+                _register_tools(agent)
+                _agent = agent
+    return _agent
+
+
+# Example usage
+def run_agent(query):
+    try:
+        result = get_agent().run_sync(query)
+        return result.data
+    except Exception as e:
+        return f"Error: {{e}}"
+'''
+
         code = f'''
 from pydantic_ai import Agent
 from pydantic_ai.run import RunContext
@@ -122,6 +205,96 @@ def run_agent(query):
         return code
 
 
+class AgentFactoryRegistry:
+    """
+    Registry of agent factories by framework name and alias.
+
+    A factory is registered either as an AgentFactory subclass or as a
+    "module:ClassName" string. String targets are imported on first use, so
+    registering a framework never imports its module (or SDK) up front.
+
+    Third-party packages can also expose factories through the
+    "agent_script_generator.factories" entry point group; entry points are
+    only discovered when a name is not found in the registry.
+    """
+
+    ENTRY_POINT_GROUP = "agent_script_generator.factories"
+
+    def __init__(self):
+        self._targets: Dict[str, Any] = {}
+        self._instances: Dict[str, AgentFactory] = {}
+        self._aliases: Dict[str, str] = {}
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Any, aliases: Optional[List[str]] = None) -> None:
+        """
+        Register a factory under a framework name and optional aliases.
+
+        Args:
+            name: Canonical framework name
+            factory: AgentFactory subclass or "module:ClassName" string
+            aliases: Other names that resolve to the same factory
+        """
+        name = name.lower()
+        with self._lock:
+            self._targets[name] = factory
+            self._instances.pop(name, None)
+            self._aliases[name] = name
+            for alias in aliases or []:
+                self._aliases[alias.lower()] = name
+
+    def names(self) -> List[str]:
+        """Return the registered canonical framework names."""
+        return sorted(self._targets)
+
+    def _load_entry_points(self) -> None:
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=self.ENTRY_POINT_GROUP):
+            if entry_point.name.lower() not in self._aliases:
+                self.register(entry_point.name, entry_point)
+        self._entry_points_loaded = True
+
+    def get(self, framework: str) -> AgentFactory:
+        """
+        Return the factory instance for a framework name or alias.
+
+        Raises:
+            ValueError: If the framework is not supported
+        """
+        framework = framework.lower()
+        if framework not in self._aliases and not self._entry_points_loaded:
+            self._load_entry_points()
+        name = self._aliases.get(framework)
+        if name is None:
+            raise ValueError(f"Unsupported framework: {framework}")
+
+        factory = self._instances.get(name)
+        if factory is not None:
+            return factory
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._resolve(self._targets[name])()
+            return self._instances[name]
+
+    @staticmethod
+    def _resolve(target: Any) -> type:
+        if isinstance(target, str):
+            module_name, _, attr = target.partition(":")
+            target = getattr(importlib.import_module(module_name), attr)
+        elif hasattr(target, "load"):
+            target = target.load()
+        return target
+
+
+# Registry used by AgentFactoryProvider
+factory_registry = AgentFactoryRegistry()
+factory_registry.register("crewai", CrewAIAgentFactory)
+factory_registry.register("pydantic-ai", PydanticAIAgentFactory,
+                          aliases=["pydantic_ai", "pydanticai"])
+
+
 class AgentFactoryProvider:
     """Provider class to get the appropriate factory based on the framework."""
 
@@ -139,35 +312,289 @@ class AgentFactoryProvider:
         Raises:
             ValueError: If the framework is not supported
         """
-        framework = framework.lower()
+        return factory_registry.get(framework)
 
-        if framework == "crewai":
-            return CrewAIAgentFactory()
-        elif framework in ["pydantic-ai", "pydantic_ai", "pydanticai"]:
-            return PydanticAIAgentFactory()
-        else:
-            raise ValueError(f"Unsupported framework: {framework}")
+    @staticmethod
+    def register(name: str, factory: Any, aliases: Optional[List[str]] = None) -> None:
+        """
+        Register a factory for a framework.
+
+        Args:
+            name: Framework name
+            factory: AgentFactory subclass or "module:ClassName" string
+            aliases: Other names that resolve to the same factory
+        """
+        factory_registry.register(name, factory, aliases)
+
+
+def config_hash(agent_config: Dict[str, Any]) -> str:
+    """
+    Compute a canonical hash of an agent configuration.
+
+    Keys are sorted and whitespace is dropped, so two configs that only differ
+    in key order or formatting hash to the same value.
+
+    Args:
+        agent_config: Dictionary containing agent configuration
+
+    Returns:
+        Hex encoded SHA-256 digest of the normalized configuration
+    """
+    normalized = dict(agent_config)
+    if isinstance(normalized.get("framework"), str):
+        normalized["framework"] = normalized["framework"].lower()
+    canonical = json.dumps(normalized, sort_keys=True,
+                           separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
-def generate_agent_code(agent_config: Dict[str, Any]) -> str:
+class AgentCodeCache:
+    """
+    Content-addressed LRU cache for generated agent code.
+
+    Entries are keyed on the factory type and either a key supplied by the
+    caller (e.g. an id and version of the configuration) or the canonical
+    hash of the agent configuration. Hashing a configuration costs more than
+    rendering the built-in templates, so the cache only pays off for
+    factories whose rendering is expensive, or when the caller has a key.
+    The least recently used entry is evicted once the cache holds more than
+    max_size entries. A max_size of 0 disables caching.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        if max_size < 0:
+            raise ValueError("max_size must be >= 0")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, factory: "AgentFactory", agent_config: Dict[str, Any],
+                      key: Optional[str] = None) -> str:
+        """
+        Return cached code for the configuration, generating it on a miss.
+
+        Args:
+            factory: Factory used to render the code on a cache miss
+            agent_config: Dictionary containing agent configuration
+            key: Identity of the configuration; it must change whenever the
+                configuration does. Defaults to the configuration hash
+
+        Returns:
+            String representation of the generated agent code
+        """
+        key = f"{type(factory).__name__}:{key or config_hash(agent_config)}"
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return code
+            self.misses += 1
+
+        code = factory.create_agent(agent_config)
+
+        with self._lock:
+            if self.max_size:
+                self._entries[key] = code
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return code
+
+    def resize(self, max_size: int) -> None:
+        """Change the maximum number of entries, evicting if needed."""
+        if max_size < 0:
+            raise ValueError("max_size must be >= 0")
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared cache used by generate_agent_code
+agent_code_cache = AgentCodeCache()
+
+
+def generate_agent_code(agent_config: Dict[str, Any], use_cache: bool = False,
+                        validate: bool = False, cache_key: Optional[str] = None) -> str:
     """
     Generate agent code based on the configuration.
 
     Args:
         agent_config: Dictionary containing agent configuration
+        use_cache: Serve identical configurations from agent_code_cache. Off
+            by default: hashing the configuration costs more than rendering
+            the built-in templates
+        validate: Compile the generated code to check its syntax
+        cache_key: Identity and version of the configuration, used as the
+            cache key instead of the configuration hash; implies use_cache
 
     Returns:
         String representation of the generated agent code
 
     Raises:
-        ValueError: If the framework is not specified or not supported
+        ValueError: If the framework is not specified or not supported, or
+            validate is set and the generated code is not valid Python
     """
     framework = agent_config.get("framework")
     if not framework:
         raise ValueError("Framework not specified in agent configuration")
 
     factory = AgentFactoryProvider.get_factory(framework)
-    return factory.create_agent(agent_config)
+    if use_cache or cache_key:
+        code = agent_code_cache.get_or_create(factory, agent_config, cache_key)
+    else:
+        code = factory.create_agent(agent_config)
+    if validate:
+        compile_agent_code(code)
+    return code
+
+
+# Flags of a PEP 552 hash-based .pyc whose source hash is checked on import
+_PYC_CHECKED_HASH_FLAGS = (0b11).to_bytes(4, "little")
+_PYC_HEADER_SIZE = 16
+
+
+def source_hash(code: str) -> str:
+    """Return the hex SHA-256 digest of generated source code."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _compile_source(code: str) -> CodeType:
+    return compile(code, "<generated-agent>", "exec")
+
+
+def compile_agent_code(code: str) -> CodeType:
+    """
+    Compile generated agent code into a code object.
+
+    Compiled code objects are memoized by source, so compiling the same
+    generated script again is a dictionary lookup.
+
+    Args:
+        code: Generated agent source code
+
+    Returns:
+        Code object that can be passed to exec
+
+    Raises:
+        ValueError: If the code is not valid Python
+    """
+    try:
+        return _compile_source(code)
+    except SyntaxError as e:
+        raise ValueError(f"Generated code has invalid syntax: {e.msg} (line {e.lineno})") from e
+
+
+def write_agent_artifact(code: str, cache_dir: str) -> str:
+    """
+    Write a .pyc artifact for generated code, keyed by the source hash.
+
+    The artifact uses the hash-based .pyc layout (PEP 552): magic number,
+    flags, the importlib source hash and the marshalled code object. Existing
+    artifacts are reused.
+
+    Args:
+        code: Generated agent source code
+        cache_dir: Directory the artifact is written to
+
+    Returns:
+        Path of the artifact
+
+    Raises:
+        ValueError: If the code is not valid Python
+    """
+    path = os.path.join(cache_dir, f"{source_hash(code)}.pyc")
+    if os.path.exists(path):
+        return path
+
+    code_object = compile_agent_code(code)
+    data = (importlib.util.MAGIC_NUMBER
+            + _PYC_CHECKED_HASH_FLAGS
+            + importlib.util.source_hash(code.encode("utf-8"))
+            + marshal.dumps(code_object))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file first so readers never see a partial artifact
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_agent_artifact(path: str) -> CodeType:
+    """
+    Load the code object of an artifact written by write_agent_artifact.
+
+    Args:
+        path: Path of the artifact
+
+    Returns:
+        Code object that can be passed to exec
+
+    Raises:
+        ValueError: If the artifact was written by another Python version or
+            is not an agent artifact
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != importlib.util.MAGIC_NUMBER:
+        raise ValueError(f"Artifact {path} was compiled by another Python version")
+    if data[4:8] != _PYC_CHECKED_HASH_FLAGS:
+        raise ValueError(f"Invalid agent artifact: {path}")
+    return marshal.loads(data[_PYC_HEADER_SIZE:])
+
+
+def generate_compiled_agent(agent_config: Dict[str, Any],
+                            cache_dir: Optional[str] = None) -> CodeType:
+    """
+    Generate agent code and return it as a compiled code object.
+
+    Args:
+        agent_config: Dictionary containing agent configuration
+        cache_dir: Optional directory to persist the compiled artifact in, so
+            other processes can load it with load_agent_artifact
+
+    Returns:
+        Code object that can be passed to exec
+
+    Raises:
+        ValueError: If the framework is not specified or not supported, or
+            the generated code is not valid Python
+    """
+    code = generate_agent_code(agent_config)
+    if cache_dir:
+        write_agent_artifact(code, cache_dir)
+    return compile_agent_code(code)
 
 
 def parse_agent_json(json_str: str) -> Dict[str, Any]:
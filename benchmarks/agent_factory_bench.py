@@ -0,0 +1,227 @@
+"""
+Benchmark suite for the agent factory and workflow code generation
+
+Runs generate_agent_code, parse_agent_json, the per-framework template
+rendering paths and workflow parsing/generation against synthetic configs of
+increasing size:
+
+- tool counts from 1 to 1000
+- system prompts from 100 B to 1 MB
+- workflows from 1 to 500 nodes
+
+For every case it reports throughput, p50/p99 latency and allocations (peak
+traced memory and allocated blocks per call, measured in a separate pass so
+tracing does not skew the timings). Results can be stored as a baseline and
+later runs compared against it; a case whose p50 latency regresses by more
+than the threshold is flagged and the exit code is 1.
+
+Usage:
+    poetry run python -m benchmarks.agent_factory_bench --save-baseline
+    poetry run python -m benchmarks.agent_factory_bench --compare --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from agent_factory import (
+    CrewAIAgentFactory,
+    PydanticAIAgentFactory,
+    agent_code_cache,
+    generate_agent_code,
+    parse_agent_json,
+)
+from workflow_generator import IncrementalWorkflowGenerator
+from workflow_parser import parse_workflow
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "agent_factory_baseline.json")
+
+TOOL_COUNTS = [1, 10, 100, 1000]
+PROMPT_SIZES = [100, 10_000, 1_000_000]
+NODE_COUNTS = [1, 50, 500]
+
+
+def synthetic_agent_config(framework: str, tools: int = 3, prompt_size: int = 100) -> Dict[str, Any]:
+    """Build an agent config with the given number of tools and prompt size."""
+    return {
+        "framework": framework,
+        "role": "Synthetic Agent",
+        "systemPrompt": ("x" * prompt_size),
+        "expectedOutput": "A synthetic answer",
+        "model": "gpt-4o-mini",
+        "tools": [f"tool_{i}" for i in range(tools)],
+    }
+
+
+def synthetic_workflow(nodes: int) -> Dict[str, Any]:
+    """Build a workflow spec shaped like json_data/workflow_v2.json."""
+    node_ids = [f"agent_{i}" for i in range(nodes)]
+    return {
+        "name": "Synthetic Flow",
+        "workflow_id": f"synthetic_{nodes}",
+        "criteria": {
+            "tools": [{"type": "API", "name": f"tool_{i}", "description": "Synthetic tool",
+                       "config": {"method": "GET", "url": f"http://localhost/{i}"}}
+                      for i in range(min(nodes, 20))],
+            "graph": {
+                "nodes": [{
+                    "id": node_id,
+                    "name": node_id,
+                    "function": "agent_node",
+                    "prompt": f"You are agent {node_id}.",
+                    "tools": [f"tool_{i % 20}"],
+                    "interrupt": {"before": {"message": "", "enabled": False},
+                                  "after": {"message": "", "enabled": False}},
+                    "llm": {"model_name": "gpt-4o-mini", "model_provider": "openai",
+                            "temperature": 0},
+                } for i, node_id in enumerate(node_ids)],
+                "edges": [{"source": source, "target": target, "conditional": False}
+                          for source, target in zip(["START"] + node_ids, node_ids + ["END"])],
+            },
+        },
+    }
+
+
+def benchmark_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    """Return (name, callable) pairs for every benchmark case."""
+    cases = []
+    factories = {"crewai": CrewAIAgentFactory(), "pydantic-ai": PydanticAIAgentFactory()}
+
+    for framework, factory in factories.items():
+        for tools in TOOL_COUNTS:
+            config = synthetic_agent_config(framework, tools=tools)
+            cases.append((f"render/{framework}/tools={tools}",
+                          lambda f=factory, c=config: f.create_agent(c)))
+        for size in PROMPT_SIZES:
+            config = synthetic_agent_config(framework, prompt_size=size)
+            cases.append((f"render/{framework}/prompt={size}B",
+                          lambda f=factory, c=config: f.create_agent(c)))
+        lazy_config = dict(synthetic_agent_config(framework, tools=10), lazyInit=True)
+        cases.append((f"render/{framework}/lazy/tools=10",
+                      lambda f=factory, c=lazy_config: f.create_agent(c)))
+
+    for tools in TOOL_COUNTS:
+        config = synthetic_agent_config("crewai", tools=tools)
+        cases.append((f"generate_agent_code/uncached/tools={tools}",
+                      lambda c=config: generate_agent_code(c, use_cache=False)))
+        cases.append((f"generate_agent_code/cached/tools={tools}",
+                      lambda c=config: generate_agent_code(c, use_cache=True)))
+        cases.append((f"generate_agent_code/cache_key/tools={tools}",
+                      lambda c=config, k=f"bench-{tools}:1": generate_agent_code(c, cache_key=k)))
+
+    for size in PROMPT_SIZES:
+        document = json.dumps({"agent": synthetic_agent_config("crewai", prompt_size=size)})
+        cases.append((f"parse_agent_json/prompt={size}B",
+                      lambda d=document: parse_agent_json(d)))
+
+    for nodes in NODE_COUNTS:
+        workflow = synthetic_workflow(nodes)
+        document = json.dumps(workflow)
+        cases.append((f"parse_workflow/nodes={nodes}",
+                      lambda d=document: parse_workflow(d)))
+        # the code cache is cleared too, so every node is rendered again
+        cases.append((f"workflow_generate/full/nodes={nodes}",
+                      lambda w=workflow: (agent_code_cache.clear(),
+                                          IncrementalWorkflowGenerator().generate(w))))
+        generator = IncrementalWorkflowGenerator()
+        generator.generate(workflow)
+        cases.append((f"workflow_generate/unchanged/nodes={nodes}",
+                      lambda g=generator, w=workflow: g.generate(w)))
+    return cases
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func: Callable[[], Any], min_time: float, min_runs: int, max_runs: int) -> Dict[str, float]:
+    """Time func repeatedly and measure its allocations in a separate pass."""
+    func()  # warm up
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_runs and (
+            len(timings) < min_runs or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    total = sum(timings)
+    return {
+        "runs": len(timings),
+        "ops_per_sec": len(timings) / total if total else float("inf"),
+        "p50_ms": _percentile(timings, 0.50) * 1000,
+        "p99_ms": _percentile(timings, 0.99) * 1000,
+        "peak_kb": peak / 1024,
+        "alloc_blocks": blocks,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Return the names of cases whose p50 regressed beyond threshold."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous and result["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def run(args: argparse.Namespace) -> int:
+    results = {}
+    print(f"{'case':<45} {'ops/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>10} {'blocks':>8}")
+    for name, func in benchmark_cases():
+        if args.filter and args.filter not in name:
+            continue
+        result = measure(func, args.min_time, args.min_runs, args.max_runs)
+        results[name] = result
+        print(f"{name:<45} {result['ops_per_sec']:>12.1f} {result['p50_ms']:>10.3f} "
+              f"{result['p99_ms']:>10.3f} {result['peak_kb']:>10.1f} {result['alloc_blocks']:>8}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\nNo baseline found at {args.baseline}")
+            return 1
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%} (p50):")
+            for name in regressions:
+                print(f"  {name}: {baseline[name]['p50_ms']:.3f} ms -> {results[name]['p50_ms']:.3f} ms")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent factory benchmark suite")
+    parser.add_argument("--filter", default="", help="only run cases containing this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per case")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--max-runs", type=int, default=10_000)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed p50 slowdown before a case is flagged")
+    sys.exit(run(parser.parse_args()))
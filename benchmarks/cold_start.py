@@ -0,0 +1,56 @@
+"""
+Cold-start benchmark for langgraph_multi_agent_framework.py
+
+Measures, in fresh interpreters, how long it takes to import
+langgraph_multi_agent_framework (which builds and compiles the graph) with
+the framework agents left lazy, and how long it takes when the CrewAI and
+autogen objects are built up front as the module used to do at import time.
+The difference is the cold-start time saved by lazy construction.
+
+Requires crewai, autogen and OPENAI_API_KEY (no request is sent).
+
+Usage:
+    poetry run python -m benchmarks.cold_start --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+_LAZY = (
+    "import time; t = time.perf_counter(); "
+    "import langgraph_multi_agent_framework; "
+    "print(time.perf_counter() - t)"
+)
+
+_EAGER = (
+    "import time; t = time.perf_counter(); "
+    "import langgraph_multi_agent_framework; "
+    "from agentFrameworks import crew_ai_agent, autogen_ai_agent; "
+    "crew_ai_agent.get_crew_pool(); autogen_ai_agent.get_autogen_pool(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure(snippet: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", snippet],
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+        timings.append(float(completed.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="langgraph_multi_agent_framework cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lazy = statistics.median(measure(_LAZY, args.runs))
+    eager = statistics.median(measure(_EAGER, args.runs))
+    print(f"lazy  (agents built on first use): {lazy * 1000:8.1f} ms")
+    print(f"eager (agents built at import):    {eager * 1000:8.1f} ms")
+    print(f"saved at cold start:               {(eager - lazy) * 1000:8.1f} ms")
@@ -0,0 +1,92 @@
+"""
+Concurrent conversations served by ConversationServer with a fake LLM
+
+Runs N conversations at once on one event loop. Each conversation starts a
+thread, gets interrupted for a confirmation and resumes, like hitl_sample_6.
+The LLM is langchain's FakeListChatModel behind an asyncio.sleep of the
+configured latency (its own `sleep` blocks a worker thread), so the numbers
+show the server and checkpointer overhead. It needs no OpenAI key.
+
+Conversations are kept in memory by default; pass --db-uri to use an
+AsyncPostgresSaver on a connection pool instead.
+
+Usage:
+    poetry run python -m benchmarks.conversation_server_load --conversations 1000 2000 5000
+    poetry run python -m benchmarks.conversation_server_load --db-uri postgresql://... --pool-size 20
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.language_models import FakeListChatModel
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import interrupt
+
+from conversation_server import ConversationServer
+
+
+def make_builder(llm_latency: float) -> StateGraph:
+    model = FakeListChatModel(responses=["It might be cloudy in nyc"])
+
+    async def get_agent(state: MessagesState):
+        answer = interrupt("confirm access to weather information")
+        # simulated network latency of the LLM call
+        await asyncio.sleep(llm_latency)
+        reply = await model.ainvoke(state["messages"] + [("user", answer)])
+        return {"messages": [reply]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("get_agent", get_agent)
+    builder.add_edge(START, "get_agent")
+    builder.add_edge("get_agent", END)
+    return builder
+
+
+async def conversation(server: ConversationServer, thread_id: str) -> None:
+    started = await server.start(thread_id, "what is the weather in nyc")
+    if not started["interrupts"]:
+        raise RuntimeError(f"thread {thread_id} was not interrupted")
+    resumed = await server.resume(thread_id, "yes")
+    if not resumed["reply"]:
+        raise RuntimeError(f"thread {thread_id} got no reply")
+
+
+async def run(server: ConversationServer, count: int, run_id: int) -> None:
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(conversation(server, f"{run_id}-{i}") for i in range(count)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    failures = sum(isinstance(r, Exception) for r in results)
+    metrics = server.metrics()
+    print(f"{count:>8} {elapsed:>9.2f} {count / elapsed:>12.1f} {failures:>8}"
+          f" {metrics['p50_ms']:>9.1f} {metrics['p99_ms']:>9.1f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    builder = make_builder(args.llm_latency)
+    print(f"{'convs':>8} {'seconds':>9} {'convs/sec':>12} {'failed':>8}"
+          f" {'p50 ms':>9} {'p99 ms':>9}")
+    if args.db_uri:
+        from checkpointer_service import async_postgres_checkpointer
+
+        async with async_postgres_checkpointer(args.db_uri, max_size=args.pool_size) as saver:
+            server = ConversationServer.from_builder(builder, saver, args.max_concurrency)
+            for run_id, count in enumerate(args.conversations):
+                await run(server, count, run_id)
+        return
+    server = ConversationServer.from_builder(builder, MemorySaver(), args.max_concurrency)
+    for run_id, count in enumerate(args.conversations):
+        await run(server, count, run_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ConversationServer load test")
+    parser.add_argument("--conversations", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="seconds the fake LLM takes per call")
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--db-uri", default=None)
+    parser.add_argument("--pool-size", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""
+Per-turn cost of call_crew_agent as the message history grows
+
+Compares the current call_crew_agent, which returns only the new AIMessage,
+with the previous implementation that deep-copied and converted the whole
+history on every turn. get_crew_pool() is patched to hand out a stub crew
+with a constant response, so only the node's own overhead is measured.
+
+Usage:
+    poetry run python -m benchmarks.crew_node_history --turns 10 100 300 1000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from copy import deepcopy
+from unittest import mock
+
+from langchain_core.messages import AIMessage, HumanMessage, convert_to_openai_messages
+
+from agentFrameworks import crew_ai_agent
+from agentFrameworks.pool import InstancePool
+
+
+def legacy_call_crew_agent(state):
+    """Previous node body: deepcopy and full conversion on every turn."""
+    state_clone = deepcopy(state["messages"])
+    messages = convert_to_openai_messages(state["messages"])
+    with crew_ai_agent.get_crew_pool().lease() as crew:
+        result = crew.kickoff(inputs={"topic": messages[-1]})
+    state_clone.append(AIMessage(content=str(result)))
+    return {"messages": state_clone}
+
+
+def make_history(turns: int) -> list:
+    history = []
+    for i in range(turns):
+        history.append(HumanMessage(content=f"question {i} " + "x" * 200, id=f"h{i}"))
+        history.append(AIMessage(content=f"answer {i} " + "y" * 200, id=f"a{i}"))
+    history.append(HumanMessage(content="latest question", id="latest"))
+    return history
+
+
+def time_node(node, state, repeat: int) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        node(state)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            node(state)
+    return (time.perf_counter() - started) / repeat
+
+
+def run(turns_list, repeat: int) -> None:
+    print(f"{'turns':>8} {'legacy ms':>12} {'delta ms':>12}")
+    fake_crew = mock.Mock()
+    fake_crew.kickoff.return_value = "ok"
+    fake_pool = InstancePool(lambda: fake_crew, size=1)
+    with mock.patch.object(crew_ai_agent, "get_crew_pool", return_value=fake_pool):
+        for turns in turns_list:
+            state = {"messages": make_history(turns)}
+            legacy = time_node(legacy_call_crew_agent, state, repeat)
+            delta = time_node(crew_ai_agent.call_crew_agent, state, repeat)
+            print(f"{turns:>8} {legacy * 1000:>12.3f} {delta * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="call_crew_agent per-turn benchmark")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.turns, args.repeat)
@@ -0,0 +1,82 @@
+"""
+Checkpoint storage of a growing MessagesState: default saver vs delta saver
+
+Runs one thread of a MessagesState graph for N turns, where each turn
+appends a user message and a reply, against the default InMemorySaver and
+against DeltaCheckpointSaver wrapping an InMemorySaver. Reports the bytes of
+channel values stored, the time per turn and the time to read the latest
+state with a cold resolution cache (a fresh DeltaCheckpointSaver over the
+same storage).
+
+Usage:
+    poetry run python -m benchmarks.delta_checkpoint_bench --turns 50 200 500 --snapshot-every 20
+"""
+
+import argparse
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from delta_checkpointer import DeltaCheckpointSaver
+
+
+def make_builder(message_size: int) -> StateGraph:
+    def reply(state: MessagesState):
+        return {"messages": [AIMessage(content="r" * message_size)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder
+
+
+def stored_bytes(saver: InMemorySaver) -> int:
+    return sum(len(blob[1]) for blob in saver.blobs.values())
+
+
+def run_thread(builder: StateGraph, checkpointer, turns: int, message_size: int) -> float:
+    graph = builder.compile(checkpointer=checkpointer)
+    config = {"configurable": {"thread_id": "bench"}}
+    started = time.perf_counter()
+    for _ in range(turns):
+        graph.invoke({"messages": [HumanMessage(content="q" * message_size)]}, config)
+    return (time.perf_counter() - started) / turns
+
+
+def cold_read(builder: StateGraph, checkpointer) -> float:
+    graph = builder.compile(checkpointer=checkpointer)
+    started = time.perf_counter()
+    graph.get_state({"configurable": {"thread_id": "bench"}})
+    return time.perf_counter() - started
+
+
+def run(turns_list, message_size: int, snapshot_every: int) -> None:
+    builder = make_builder(message_size)
+    print(f"{'turns':>6} {'default KB':>11} {'delta KB':>10} {'ratio':>7}"
+          f" {'default ms/turn':>16} {'delta ms/turn':>14} {'default read ms':>16} {'delta read ms':>14}")
+    for turns in turns_list:
+        default = InMemorySaver()
+        default_turn = run_thread(builder, default, turns, message_size)
+        default_read = cold_read(builder, default)
+
+        storage = InMemorySaver()
+        delta_turn = run_thread(
+            builder, DeltaCheckpointSaver(storage, snapshot_every=snapshot_every), turns, message_size)
+        delta_read = cold_read(builder, DeltaCheckpointSaver(storage, snapshot_every=snapshot_every))
+
+        default_kb, delta_kb = stored_bytes(default) / 1024, stored_bytes(storage) / 1024
+        print(f"{turns:>6} {default_kb:>11.1f} {delta_kb:>10.1f} {default_kb / delta_kb:>6.1f}x"
+              f" {default_turn * 1000:>16.3f} {delta_turn * 1000:>14.3f}"
+              f" {default_read * 1000:>16.3f} {delta_read * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta checkpoint storage benchmark")
+    parser.add_argument("--turns", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--message-size", type=int, default=200)
+    parser.add_argument("--snapshot-every", type=int, default=20)
+    args = parser.parse_args()
+    run(args.turns, args.message_size, args.snapshot_every)
@@ -0,0 +1,72 @@
+"""
+Import-time benchmark for generated agent scripts
+
+Generates the same agent with and without the "lazyInit" option and measures
+how long a fresh interpreter takes to import each generated module. Requires
+the target framework (crewai / pydantic-ai) to be installed.
+
+Usage:
+    poetry run python -m benchmarks.generated_import_time --framework pydantic-ai --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from agent_factory import generate_agent_code
+
+_TIMER = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import(directory: str, module: str, runs: int) -> list:
+    """Import module in `runs` fresh interpreters and return the timings."""
+    timings = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(module=module)],
+            cwd=directory, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+        timings.append(float(completed.stdout.strip()))
+    return timings
+
+
+def run(framework: str, runs: int) -> None:
+    agent_config = {
+        "framework": framework,
+        "role": "Market Research Analyst",
+        "systemPrompt": "Provide up-to-date market analysis of the AI industry",
+        "expectedOutput": "An expert analyst with a keen eye for market trends",
+        "model": "gpt-4o-mini",
+        "tools": ["search_wikipedia", "get_current_weather"],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, lazy in (("eager_agent", False), ("lazy_agent", True)):
+            code = generate_agent_code(dict(agent_config, lazyInit=lazy))
+            with open(os.path.join(directory, f"{name}.py"), "w") as f:
+                f.write(code)
+
+        print(f"Import time of generated {framework} modules ({runs} runs)")
+        for name in ("eager_agent", "lazy_agent"):
+            try:
+                timings = measure_import(directory, name, runs)
+            except RuntimeError as e:
+                print(f"  {name:<12} failed: {e}")
+                continue
+            print(f"  {name:<12} median {statistics.median(timings) * 1000:8.2f} ms"
+                  f"  min {min(timings) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--framework", default="pydantic-ai")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run(args.framework, args.runs)
@@ -0,0 +1,65 @@
+"""
+Per-turn graph overhead of hitl_sample_6 with and without the graph cache
+
+Each simulated turn gets a graph for the conversation and reads the thread's
+state, as start_conversation and resum_graph do. It either compiles the
+builder (the previous behaviour) or takes the graph from compile_cached. The
+graph mirrors hitl_sample_6, with the agent node replaced by a stub. An
+in-memory checkpointer is used, so only the framework overhead is measured
+and neither Postgres nor an OpenAI key is needed.
+
+Usage:
+    poetry run python -m benchmarks.hitl_turn_overhead --turns 500
+"""
+
+import argparse
+import statistics
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, Graph
+
+from graph_cache import BuilderGraphCache
+
+
+def make_builder() -> Graph:
+    builder = Graph()
+    builder.add_node("get_agent", lambda state: state)
+    builder.add_edge("get_agent", END)
+    builder.set_entry_point("get_agent")
+    return builder
+
+
+def run_turns(get_graph, turns: int) -> list:
+    config = {"configurable": {"thread_id": "bench"}}
+    timings = []
+    for _ in range(turns):
+        started = time.perf_counter()
+        graph = get_graph()
+        graph.get_state(config)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<10} mean {statistics.mean(timings) * 1e6:10.1f} us"
+          f"   p50 {statistics.median(timings) * 1e6:10.1f} us   p99 {p99 * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="hitl_sample_6 per-turn graph overhead")
+    parser.add_argument("--turns", type=int, default=500)
+    args = parser.parse_args()
+
+    builder = make_builder()
+    checkpointer = MemorySaver()
+    cache = BuilderGraphCache()
+
+    uncached = run_turns(lambda: builder.compile(checkpointer=checkpointer), args.turns)
+    cached = run_turns(lambda: cache.get_or_compile(builder, checkpointer), args.turns)
+    report("compile", uncached)
+    report("cached", cached)
+    print(f"speedup    {statistics.mean(uncached) / statistics.mean(cached):10.1f}x"
+          f"   cache {cache.stats()}")
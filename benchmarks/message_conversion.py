@@ -0,0 +1,59 @@
+"""
+Per-turn cost of converting the message history to OpenAI format
+
+Compares convert_to_openai_messages on the whole history, which the autogen
+node did on every turn, with OpenAIMessageConverter, which keeps the
+converted history of each thread, compares a fingerprint of every message
+with the one it converted and only converts from the first change, here
+the messages appended since the previous turn.
+
+Usage:
+    poetry run python -m benchmarks.message_conversion --turns 10 100 1000 5000
+"""
+
+import argparse
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, convert_to_openai_messages
+
+from agentFrameworks.message_cache import OpenAIMessageConverter
+
+
+def make_history(turns: int) -> list:
+    history = []
+    for i in range(turns):
+        history.append(HumanMessage(content=f"question {i} " + "x" * 200, id=f"h{i}"))
+        history.append(AIMessage(content=f"answer {i} " + "y" * 200, id=f"a{i}"))
+    return history
+
+
+def time_turns(convert, history: list, repeat: int) -> float:
+    """Average time of one turn that appends a question to history."""
+    convert(history)
+    total = 0.0
+    for i in range(repeat):
+        history.append(HumanMessage(content=f"follow-up {i}", id=f"f{i}"))
+        started = time.perf_counter()
+        convert(history)
+        total += time.perf_counter() - started
+    del history[-repeat:]
+    return total / repeat
+
+
+def run(turns_list, repeat: int) -> None:
+    print(f"{'turns':>8} {'full ms':>12} {'incremental ms':>16}")
+    for turns in turns_list:
+        history = make_history(turns)
+        full = time_turns(convert_to_openai_messages, history, repeat)
+        converter = OpenAIMessageConverter()
+        incremental = time_turns(lambda messages: converter.convert("bench", messages),
+                                 history, repeat)
+        print(f"{turns:>8} {full * 1000:>12.3f} {incremental * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Message conversion per-turn benchmark")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.turns, args.repeat)
@@ -0,0 +1,358 @@
+"""
+Checkpoint Retention Module
+
+This module prunes the Postgres checkpoint tables of langgraph's PostgresSaver
+(checkpoints, checkpoint_writes, checkpoint_blobs), which otherwise keep every
+step of every thread forever.
+
+Policies:
+- keep_last: keep only the newest N checkpoints of each thread and namespace
+- idle_ttl: delete threads whose newest checkpoint is older than the TTL
+- keep_interrupted: never delete a thread that waits on an interrupt, nor the
+  checkpoint and writes holding the interrupt
+
+The job walks the threads in batches of `batch_size` thread ids. Each batch
+is its own short transaction, run with a lock_timeout and statement_timeout,
+so the job never holds locks for long. A batch that cannot get its locks in
+time is skipped and retried on the next run. Writes of deleted checkpoints
+and blobs that no remaining checkpoint references are deleted as well. The
+report counts the deleted rows and their bytes; Postgres hands the space
+back to the OS after VACUUM (`vacuum=True` runs it after the job).
+
+Threads written through DeltaCheckpointSaver need the base checkpoints of
+their deltas. keep_last skips a thread when one of the checkpoints it would
+keep stores a delta (see delta_checkpointer), so such threads are only
+removed whole by idle_ttl; the report counts them as threads_delta_encoded.
+compact_thread can re-encode them into a fresh thread.
+
+Usage:
+    job = CheckpointRetentionJob(get_checkpointer_service().pool,
+                                 RetentionPolicy(keep_last=20, idle_ttl=30 * 86400))
+    print(job.run_once())
+    job.start(interval=3600)   # background thread
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERRUPT_CHANNEL = "__interrupt__"
+
+_NEXT_THREADS = """
+SELECT DISTINCT thread_id FROM checkpoints
+WHERE thread_id > %(after)s
+ORDER BY thread_id
+LIMIT %(limit)s
+"""
+
+# Threads whose newest checkpoint, in any namespace, holds an interrupt
+_INTERRUPTED_THREADS = """
+WITH latest AS (
+    SELECT DISTINCT ON (thread_id, checkpoint_ns) thread_id, checkpoint_ns, checkpoint_id
+    FROM checkpoints
+    WHERE thread_id = ANY(%(threads)s)
+    ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC
+)
+SELECT DISTINCT l.thread_id FROM latest l
+WHERE EXISTS (
+    SELECT 1 FROM checkpoint_writes w
+    WHERE w.thread_id = l.thread_id AND w.checkpoint_ns = l.checkpoint_ns
+      AND w.checkpoint_id = l.checkpoint_id AND w.channel = %(interrupt)s
+)
+"""
+
+_IDLE_THREADS = """
+SELECT thread_id FROM checkpoints
+WHERE thread_id = ANY(%(threads)s)
+GROUP BY thread_id
+HAVING max((checkpoint->>'ts')::timestamptz) < now() - make_interval(secs => %(ttl)s)
+"""
+
+# Threads where one of the checkpoints keep_last would keep stores a delta
+_DELTA_THREADS = """
+WITH kept AS (
+    SELECT thread_id, checkpoint_ns, checkpoint FROM (
+        SELECT thread_id, checkpoint_ns, checkpoint,
+               row_number() OVER (PARTITION BY thread_id, checkpoint_ns
+                                  ORDER BY checkpoint_id DESC) AS rank
+        FROM checkpoints
+        WHERE thread_id = ANY(%(threads)s)
+    ) ranked
+    WHERE rank <= %(keep_last)s
+)
+SELECT DISTINCT b.thread_id FROM kept k
+JOIN checkpoint_blobs b
+  ON b.thread_id = k.thread_id AND b.checkpoint_ns = k.checkpoint_ns
+ AND k.checkpoint->'channel_versions'->>b.channel = b.version
+WHERE position(%(marker)s::bytea in b.blob) > 0
+"""
+
+_DELETE_THREADS = """
+WITH deleted AS (
+    DELETE FROM {table} t WHERE t.thread_id = ANY(%(threads)s)
+    RETURNING pg_column_size(t.*) AS size
+)
+SELECT count(*), coalesce(sum(size), 0) FROM deleted
+"""
+
+# Checkpoint ids are time ordered, newest first is the saver's own ordering
+_DELETE_OLD_CHECKPOINTS = """
+WITH ranked AS (
+    SELECT thread_id, checkpoint_ns, checkpoint_id,
+           row_number() OVER (PARTITION BY thread_id, checkpoint_ns
+                              ORDER BY checkpoint_id DESC) AS rank
+    FROM checkpoints
+    WHERE thread_id = ANY(%(threads)s)
+), deleted AS (
+    DELETE FROM checkpoints c
+    USING ranked r
+    WHERE c.thread_id = r.thread_id AND c.checkpoint_ns = r.checkpoint_ns
+      AND c.checkpoint_id = r.checkpoint_id AND r.rank > %(keep_last)s
+      AND NOT (%(keep_interrupted)s AND EXISTS (
+          SELECT 1 FROM checkpoint_writes w
+          WHERE w.thread_id = c.thread_id AND w.checkpoint_ns = c.checkpoint_ns
+            AND w.checkpoint_id = c.checkpoint_id AND w.channel = %(interrupt)s))
+    RETURNING pg_column_size(c.*) AS size
+)
+SELECT count(*), coalesce(sum(size), 0) FROM deleted
+"""
+
+_DELETE_ORPHAN_WRITES = """
+WITH deleted AS (
+    DELETE FROM checkpoint_writes w
+    WHERE w.thread_id = ANY(%(threads)s)
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns
+            AND c.checkpoint_id = w.checkpoint_id)
+    RETURNING pg_column_size(w.*) AS size
+)
+SELECT count(*), coalesce(sum(size), 0) FROM deleted
+"""
+
+_DELETE_ORPHAN_BLOBS = """
+WITH deleted AS (
+    DELETE FROM checkpoint_blobs b
+    WHERE b.thread_id = ANY(%(threads)s)
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+            AND c.checkpoint->'channel_versions'->>b.channel = b.version)
+    RETURNING pg_column_size(b.*) AS size
+)
+SELECT count(*), coalesce(sum(size), 0) FROM deleted
+"""
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    What the retention job keeps.
+
+    Args:
+        keep_last: Newest checkpoints kept per thread and namespace, None keeps all
+        idle_ttl: Seconds after the newest checkpoint a thread is deleted, None keeps idle threads
+        keep_interrupted: Protect threads waiting on an interrupt
+        batch_size: Thread ids handled per transaction
+        lock_timeout_ms: Longest wait for a lock before a batch is skipped
+        statement_timeout_ms: Longest time a single statement may run
+        pause: Seconds to sleep between batches, to leave room for the app
+    """
+    keep_last: Optional[int] = None
+    idle_ttl: Optional[float] = None
+    keep_interrupted: bool = True
+    batch_size: int = 100
+    lock_timeout_ms: int = 1000
+    statement_timeout_ms: int = 30_000
+    pause: float = 0.0
+
+    def __post_init__(self):
+        if self.keep_last is not None and self.keep_last < 1:
+            raise ValueError("keep_last must be at least 1")
+        if self.idle_ttl is not None and self.idle_ttl <= 0:
+            raise ValueError("idle_ttl must be positive")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+
+@dataclass
+class RetentionReport:
+    """Rows and bytes removed by one run of the retention job."""
+    threads_scanned: int = 0
+    threads_deleted: int = 0
+    threads_protected: int = 0
+    threads_delta_encoded: int = 0
+    batches: int = 0
+    batches_skipped: int = 0
+    rows_deleted: Dict[str, int] = field(default_factory=lambda: {
+        "checkpoints": 0, "checkpoint_writes": 0, "checkpoint_blobs": 0})
+    bytes_reclaimed: int = 0
+    duration: float = 0.0
+
+    def add(self, table: str, rows: int, size: int) -> None:
+        self.rows_deleted[table] += rows
+        self.bytes_reclaimed += size
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "threads_scanned": self.threads_scanned,
+            "threads_deleted": self.threads_deleted,
+            "threads_protected": self.threads_protected,
+            "threads_delta_encoded": self.threads_delta_encoded,
+            "batches": self.batches,
+            "batches_skipped": self.batches_skipped,
+            "rows_deleted": dict(self.rows_deleted),
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "duration": self.duration,
+        }
+
+
+class CheckpointRetentionJob:
+    """
+    Batched pruning of the PostgresSaver tables.
+
+    Args:
+        pool: psycopg ConnectionPool (e.g. CheckpointerService.pool)
+        policy: What to keep
+    """
+
+    def __init__(self, pool: Any, policy: RetentionPolicy):
+        self.pool = pool
+        self.policy = policy
+        self.last_report: Optional[RetentionReport] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _execute(self, cursor: Any, query: str, params: Dict[str, Any]) -> List[tuple]:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def _delete(self, cursor: Any, report: RetentionReport, table: str,
+                query: str, params: Dict[str, Any]) -> None:
+        rows, size = self._execute(cursor, query, params)[0]
+        report.add(table, rows, size)
+
+    def _prune_batch(self, cursor: Any, threads: List[str], report: RetentionReport) -> None:
+        policy = self.policy
+        params = {"threads": threads, "interrupt": INTERRUPT_CHANNEL,
+                  "keep_interrupted": policy.keep_interrupted}
+        cursor.execute(f"SET LOCAL lock_timeout = {int(policy.lock_timeout_ms)}")
+        cursor.execute(f"SET LOCAL statement_timeout = {int(policy.statement_timeout_ms)}")
+
+        protected = set()
+        if policy.keep_interrupted:
+            protected = {row[0] for row in self._execute(cursor, _INTERRUPTED_THREADS, params)}
+            report.threads_protected += len(protected)
+
+        if policy.idle_ttl is not None:
+            idle = [row[0] for row in self._execute(
+                cursor, _IDLE_THREADS, {**params, "ttl": policy.idle_ttl})
+                if row[0] not in protected]
+            if idle:
+                for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs"):
+                    self._delete(cursor, report, table,
+                                 _DELETE_THREADS.format(table=table), {"threads": idle})
+                report.threads_deleted += len(idle)
+                deleted = set(idle)
+                threads = [t for t in threads if t not in deleted]
+                params["threads"] = threads
+
+        if policy.keep_last is not None and threads:
+            from delta_checkpointer import DELTA_MARKER
+
+            # Deltas resolve through older checkpoints, so those threads are kept whole
+            delta_threads = {row[0] for row in self._execute(cursor, _DELTA_THREADS, {
+                **params, "keep_last": policy.keep_last, "marker": DELTA_MARKER.encode()})}
+            report.threads_delta_encoded += len(delta_threads)
+            threads = [t for t in threads if t not in delta_threads]
+            params["threads"] = threads
+
+        if policy.keep_last is not None and threads:
+            self._delete(cursor, report, "checkpoints", _DELETE_OLD_CHECKPOINTS,
+                         {**params, "keep_last": policy.keep_last})
+            self._delete(cursor, report, "checkpoint_writes", _DELETE_ORPHAN_WRITES, params)
+            self._delete(cursor, report, "checkpoint_blobs", _DELETE_ORPHAN_BLOBS, params)
+
+    def run_once(self) -> RetentionReport:
+        """
+        Apply the policy to every thread, one batch per transaction.
+
+        Returns:
+            RetentionReport of this run
+        """
+        import psycopg
+        from psycopg.rows import tuple_row
+
+        report = RetentionReport()
+        started = time.perf_counter()
+        after = ""
+        while not self._stop.is_set():
+            with self.pool.connection() as conn:
+                with conn.cursor(row_factory=tuple_row) as cursor:
+                    threads = [row[0] for row in self._execute(
+                        cursor, _NEXT_THREADS, {"after": after, "limit": self.policy.batch_size})]
+                    if not threads:
+                        break
+                    after = threads[-1]
+                    report.threads_scanned += len(threads)
+                    batch = RetentionReport()
+                    try:
+                        with conn.transaction():
+                            self._prune_batch(cursor, threads, batch)
+                    except (psycopg.errors.LockNotAvailable, psycopg.errors.QueryCanceled) as e:
+                        # Busy threads are retried on the next run
+                        logger.warning("Skipped retention batch after %s: %s", threads[0], e)
+                        report.batches_skipped += 1
+                    else:
+                        self._merge(report, batch)
+            report.batches += 1
+            if self.policy.pause:
+                self._stop.wait(self.policy.pause)
+        report.duration = time.perf_counter() - started
+        self.last_report = report
+        return report
+
+    @staticmethod
+    def _merge(report: RetentionReport, batch: RetentionReport) -> None:
+        report.threads_deleted += batch.threads_deleted
+        report.threads_protected += batch.threads_protected
+        report.threads_delta_encoded += batch.threads_delta_encoded
+        for table, rows in batch.rows_deleted.items():
+            report.rows_deleted[table] += rows
+        report.bytes_reclaimed += batch.bytes_reclaimed
+
+    def vacuum(self) -> None:
+        """Run VACUUM on the checkpoint tables so freed space can be reused."""
+        with self.pool.connection() as conn:
+            conn.autocommit = True
+            for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs"):
+                conn.execute(f"VACUUM {table}")
+
+    def start(self, interval: float = 3600.0, vacuum: bool = False) -> threading.Thread:
+        """Run the job every `interval` seconds on a daemon thread until stop()."""
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    report = self.run_once()
+                    if vacuum and not self._stop.is_set():
+                        self.vacuum()
+                    logger.info("Checkpoint retention: %s", report.as_dict())
+                except Exception:
+                    logger.exception("Checkpoint retention run failed")
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="checkpoint-retention", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background job after its current batch."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,357 @@
+"""
+Conversation Server Module
+
+This module serves human-in-the-loop conversations over asyncio. Each
+conversation is a LangGraph thread; many threads run concurrently on one
+event loop, and their state lives in an async checkpointer (an
+AsyncPostgresSaver on a connection pool by default), so a conversation can
+be resumed by any server process.
+
+Operations:
+- start:  send a user message to a thread
+- resume: answer the interrupt a thread is waiting on
+- stream: either of the above, yielding tokens while the graph runs
+
+Runs on the same thread are serialized; runs on different threads are not.
+The number of graph runs in progress can be bounded with max_concurrency.
+
+Over TCP the server speaks newline-delimited JSON:
+
+    request:  {"op": "start", "thread_id": "42", "message": "hi", "stream": false}
+              {"op": "resume", "thread_id": "42", "answer": "yes"}
+              {"op": "metrics"}
+    response: {"token": "..."}   (only with "stream": true, zero or more)
+              {"done": {"thread_id": "42", "reply": "...", "interrupts": [...]}}
+              or {"error": "..."} or {"metrics": {...}}
+
+Usage:
+    poetry run python conversation_server.py --graph hitl_sample_6:builder --port 8766
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import time
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agent_code_service import MAX_LINE_BYTES, read_line
+from graph_cache import compile_cached
+
+MAX_LATENCY_SAMPLES = 10_000
+
+
+def _reply(values: Any) -> Optional[str]:
+    messages = values.get("messages") if isinstance(values, dict) else None
+    if not messages:
+        return None
+    last = messages[-1]
+    if getattr(last, "type", None) != "ai":
+        return None
+    return last.content
+
+
+def _interrupt_values(update: Dict[str, Any]) -> List[Any]:
+    return [getattr(i, "value", i) for i in update.get("__interrupt__", ())]
+
+
+class ConversationServer:
+    """
+    Asyncio server running many conversation threads of one graph.
+
+    Args:
+        graph: Compiled graph with an async checkpointer
+        max_concurrency: Maximum graph runs in progress, None for no limit
+    """
+
+    def __init__(self, graph: Any, max_concurrency: Optional[int] = None):
+        self.graph = graph
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # thread_id -> [lock, number of runs holding or waiting for it]
+        self._thread_locks: Dict[str, list] = {}
+        self._latencies: deque = deque(maxlen=MAX_LATENCY_SAMPLES)
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.active = 0
+        self.errors = 0
+        self.interrupts = 0
+
+    @classmethod
+    def from_builder(cls, builder: Any, checkpointer: Any,
+                     max_concurrency: Optional[int] = None) -> "ConversationServer":
+        """Compile builder with checkpointer (through the graph cache) and serve it."""
+        return cls(compile_cached(builder, checkpointer=checkpointer), max_concurrency)
+
+    @asynccontextmanager
+    async def _thread_lock(self, thread_id: str) -> AsyncIterator[None]:
+        entry = self._thread_locks.setdefault(thread_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._thread_locks[thread_id]
+
+    async def _run(self, thread_id: str, inputs: Any,
+                   tokens: bool) -> AsyncIterator[Dict[str, Any]]:
+        from langchain_core.messages import AIMessageChunk
+
+        config = {"configurable": {"thread_id": thread_id}}
+        stream_mode = ["values", "updates"] + (["messages"] if tokens else [])
+        started = time.perf_counter()
+        self.requests += 1
+        reply, interrupts = None, []
+        try:
+            async with self._thread_lock(thread_id):
+                if self._semaphore is not None:
+                    await self._semaphore.acquire()
+                self.active += 1
+                try:
+                    async with aclosing(self.graph.astream(
+                            inputs, config, stream_mode=stream_mode)) as chunks:
+                        async for mode, chunk in chunks:
+                            if mode == "values":
+                                reply = _reply(chunk) or reply
+                            elif mode == "updates":
+                                interrupts.extend(_interrupt_values(chunk))
+                            elif isinstance(chunk[0], AIMessageChunk) and chunk[0].content:
+                                yield {"token": chunk[0].content}
+                finally:
+                    self.active -= 1
+                    if self._semaphore is not None:
+                        self._semaphore.release()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+        self.interrupts += bool(interrupts)
+        yield {"done": {"thread_id": thread_id, "reply": reply, "interrupts": interrupts}}
+
+    def _inputs(self, message: Optional[str], answer: Any) -> Any:
+        if message is not None:
+            from langchain_core.messages import HumanMessage
+
+            return {"messages": [HumanMessage(content=message)]}
+        from langgraph.types import Command
+
+        return Command(resume=answer)
+
+    async def _result(self, events: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        async for event in events:
+            if "done" in event:
+                return event["done"]
+        raise RuntimeError("Graph run ended without a result")
+
+    async def start(self, thread_id: str, message: str) -> Dict[str, Any]:
+        """
+        Send a user message to a thread and wait for the run to finish.
+
+        Args:
+            thread_id: Conversation id
+            message: User message
+
+        Returns:
+            Dictionary with thread_id, the final assistant reply and the
+            values of any interrupts the thread now waits on
+        """
+        return await self._result(self._run(thread_id, self._inputs(message, None), False))
+
+    async def resume(self, thread_id: str, answer: Any) -> Dict[str, Any]:
+        """Answer the interrupt of a thread; returns the same result as start."""
+        return await self._result(self._run(thread_id, self._inputs(None, answer), False))
+
+    def stream(self, thread_id: str, message: Optional[str] = None,
+               answer: Any = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Start (with message) or resume (with answer) a thread, streaming tokens.
+
+        Yields:
+            {"token": ...} events while the graph runs, then {"done": result}
+        """
+        return self._run(thread_id, self._inputs(message, answer), True)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return request counters, throughput and latency percentiles."""
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        elapsed = time.perf_counter() - self._started
+        return {
+            "requests": self.requests,
+            "active": self.active,
+            "threads": len(self._thread_locks),
+            "errors": self.errors,
+            "interrupts": self.interrupts,
+            "requests_per_sec": self.requests / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+        }
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Serve newline-delimited JSON requests from one connection."""
+        try:
+            while True:
+                try:
+                    line = await read_line(reader)
+                except ValueError as e:
+                    writer.write(json.dumps({"error": str(e)}).encode() + b"\n")
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                # closed even if the client goes away mid-stream, so the run
+                # releases its thread lock and concurrency slot right away
+                async with aclosing(self._handle_line(line)) as responses:
+                    async for response in responses:
+                        writer.write(json.dumps(response, default=str).encode() + b"\n")
+                        await writer.drain()
+        except ConnectionError:
+            # the client went away
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_line(self, line: bytes) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            request = json.loads(line)
+            op = request.get("op")
+            if op == "metrics":
+                yield {"metrics": self.metrics()}
+                return
+            if op not in ("start", "resume"):
+                raise ValueError(f"Unsupported operation: {op}")
+            thread_id = str(request["thread_id"])
+            message = request.get("message") if op == "start" else None
+            if op == "start" and message is None:
+                raise ValueError("start requires a message")
+            events = self._run(thread_id, self._inputs(message, request.get("answer")),
+                               bool(request.get("stream")))
+            async with aclosing(events):
+                async for event in events:
+                    yield event
+        except json.JSONDecodeError:
+            yield {"error": "Invalid JSON string"}
+        except KeyError as e:
+            yield {"error": f"Missing field: {e.args[0]}"}
+        except Exception as e:
+            yield {"error": str(e)}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8766,
+                    limit: int = MAX_LINE_BYTES) -> asyncio.AbstractServer:
+        """Start serving on host:port, accepting lines of up to limit bytes."""
+        return await asyncio.start_server(self.handle_client, host, port, limit=limit)
+
+
+class ConversationClient:
+    """Minimal client for a running ConversationServer."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8766,
+                 limit: int = MAX_LINE_BYTES):
+        self.host = host
+        self.port = port
+        self.limit = limit
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def __aenter__(self) -> "ConversationClient":
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, limit=self.limit)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def _events(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        self._writer.write(json.dumps(payload).encode() + b"\n")
+        await self._writer.drain()
+        while True:
+            response = json.loads(await read_line(self._reader))
+            if "error" in response:
+                raise ValueError(response["error"])
+            yield response
+            if "token" not in response:
+                return
+
+    async def _result(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        async for response in self._events(payload):
+            if "done" in response:
+                return response["done"]
+        raise ValueError("Connection closed before the result")
+
+    async def start(self, thread_id: str, message: str) -> Dict[str, Any]:
+        """Send a user message to a thread and return the result."""
+        return await self._result({"op": "start", "thread_id": thread_id, "message": message})
+
+    async def resume(self, thread_id: str, answer: Any) -> Dict[str, Any]:
+        """Answer the interrupt of a thread and return the result."""
+        return await self._result({"op": "resume", "thread_id": thread_id, "answer": answer})
+
+    def stream(self, thread_id: str, message: Optional[str] = None,
+               answer: Any = None) -> AsyncIterator[Dict[str, Any]]:
+        """Start or resume a thread, yielding token events and the done event."""
+        if message is not None:
+            payload = {"op": "start", "thread_id": thread_id, "message": message}
+        else:
+            payload = {"op": "resume", "thread_id": thread_id, "answer": answer}
+        return self._events({**payload, "stream": True})
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Return the server metrics."""
+        self._writer.write(json.dumps({"op": "metrics"}).encode() + b"\n")
+        await self._writer.drain()
+        return json.loads(await read_line(self._reader))["metrics"]
+
+
+def load_builder(path: str) -> Any:
+    """Import a graph builder given as "module:attribute"."""
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise ValueError(f"Graph must be given as module:attribute, got: {path}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+async def _main(graph: str, host: str, port: int, max_concurrency: Optional[int],
+                memory: bool) -> None:
+    builder = load_builder(graph)
+    if memory:
+        from langgraph.checkpoint.memory import MemorySaver
+
+        server = ConversationServer.from_builder(builder, MemorySaver(), max_concurrency)
+        await _serve(server, host, port)
+        return
+    from checkpointer_service import async_postgres_checkpointer
+
+    async with async_postgres_checkpointer() as checkpointer:
+        server = ConversationServer.from_builder(builder, checkpointer, max_concurrency)
+        await _serve(server, host, port)
+
+
+async def _serve(server: ConversationServer, host: str, port: int) -> None:
+    tcp_server = await server.serve(host, port)
+    print(f"Serving conversations on {host}:{port}")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asyncio conversation server")
+    parser.add_argument("--graph", default="hitl_sample_6:builder",
+                        help="graph builder as module:attribute")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--memory", action="store_true",
+                        help="keep conversations in memory instead of Postgres")
+    args = parser.parse_args()
+    asyncio.run(_main(args.graph, args.host, args.port, args.max_concurrency, args.memory))
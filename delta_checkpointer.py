@@ -0,0 +1,395 @@
+"""
+Delta Checkpointer Module
+
+This module provides a checkpointer mode that stores a growing message list
+as deltas. With the default savers, every checkpoint of a MessagesState graph
+writes the whole message list again, so the bytes written per thread grow
+quadratically with its length. DeltaCheckpointSaver wraps any saver
+(InMemorySaver, PostgresSaver, ...) and writes only the messages appended
+since the parent checkpoint.
+
+Encoding of a delta channel value:
+- snapshot: the plain list, exactly as the wrapped saver stores it today, so
+  existing checkpoints are read unchanged
+- delta: {"__messages_delta__": 1, "base": <checkpoint id>, "base_len": n,
+  "append": [...], "depth": d}, meaning the first n messages of checkpoint
+  `base` followed by `append`
+
+A full snapshot is written when the history was edited rather than appended
+to, and after `snapshot_every` consecutive deltas. Reading a checkpoint walks
+at most that many deltas back to a snapshot. Resolved lists are kept in an
+LRU cache, so a thread that is being served resolves in one read.
+
+Compaction tooling:
+- compact_thread copies a thread from any saver into a delta saver
+  (optionally into another thread id), re-encoding its history
+- DeltaCheckpointSaver.chain_stats reports snapshots, deltas, chain depth
+  and stored messages of a thread
+
+Usage:
+    checkpointer = DeltaCheckpointSaver(get_checkpointer_service().checkpointer)
+    graph = builder.compile(checkpointer=checkpointer)
+"""
+
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+
+DELTA_MARKER = "__messages_delta__"
+
+# (thread_id, checkpoint_ns, checkpoint_id, channel)
+_CacheKey = Tuple[str, str, str, str]
+
+
+def is_delta(value: Any) -> bool:
+    """Return True if a stored channel value is a delta."""
+    return isinstance(value, dict) and value.get(DELTA_MARKER) == 1
+
+
+def _is_prefix(base: Sequence[Any], messages: Sequence[Any]) -> bool:
+    if len(base) > len(messages):
+        return False
+    return all(a is b or a == b for a, b in zip(base, messages))
+
+
+def _thread(config: Dict[str, Any]) -> Tuple[str, str]:
+    configurable = config["configurable"]
+    return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+
+def _checkpoint_config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Dict[str, Any]:
+    return {"configurable": {
+        "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver):
+    """
+    Checkpointer storing list channels as deltas on top of another saver.
+
+    Args:
+        saver: Wrapped checkpointer that stores the encoded checkpoints
+        channels: List channels to delta-encode
+        snapshot_every: Maximum consecutive deltas before a full snapshot
+        cache_size: Number of resolved lists kept in memory
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver, channels: Sequence[str] = ("messages",),
+                 snapshot_every: int = 20, cache_size: int = 1024):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1")
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.channels = tuple(channels)
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        self.snapshots_written = 0
+        self.deltas_written = 0
+        # key -> (resolved list, depth of its delta chain)
+        self._resolved: "OrderedDict[_CacheKey, Tuple[list, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def config_specs(self) -> list:
+        return self.saver.config_specs
+
+    def __getattr__(self, name: str) -> Any:
+        # setup(), connection handles and other saver specific members
+        if name == "saver":
+            raise AttributeError(name)
+        return getattr(self.saver, name)
+
+    def get_next_version(self, current: Optional[Any], channel: Any) -> Any:
+        return self.saver.get_next_version(current, channel)
+
+    # -- resolved list cache ------------------------------------------------
+
+    def _cached(self, key: _CacheKey) -> Optional[Tuple[list, int]]:
+        with self._lock:
+            entry = self._resolved.get(key)
+            if entry is not None:
+                self._resolved.move_to_end(key)
+            return entry
+
+    def _remember(self, key: _CacheKey, messages: list, depth: int) -> None:
+        with self._lock:
+            self._resolved[key] = (messages, depth)
+            self._resolved.move_to_end(key)
+            while len(self._resolved) > self.cache_size:
+                self._resolved.popitem(last=False)
+
+    def _forget_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._resolved if k[0] == thread_id]:
+                del self._resolved[key]
+
+    # -- encoding -----------------------------------------------------------
+
+    def _encode(self, checkpoint: Dict[str, Any], channel: str, parent_id: Optional[str],
+                parent: Optional[Tuple[list, int]]) -> Tuple[Any, int]:
+        messages = checkpoint["channel_values"][channel]
+        if parent is not None and parent_id is not None:
+            base, base_depth = parent
+            if base_depth + 1 < self.snapshot_every and _is_prefix(base, messages):
+                self.deltas_written += 1
+                return {
+                    DELTA_MARKER: 1,
+                    "base": parent_id,
+                    "base_len": len(base),
+                    "append": list(messages[len(base):]),
+                    "depth": base_depth + 1,
+                }, base_depth + 1
+        self.snapshots_written += 1
+        return messages, 0
+
+    def _encoded_channels(self, checkpoint: Dict[str, Any], new_versions: Dict[str, Any]) -> List[str]:
+        values = checkpoint.get("channel_values", {})
+        return [ch for ch in self.channels
+                if ch in new_versions and isinstance(values.get(ch), list)]
+
+    def _prepare_put(self, config: Dict[str, Any], checkpoint: Dict[str, Any],
+                     parents: Dict[str, Optional[Tuple[list, int]]]) -> Tuple[Dict[str, Any], Dict]:
+        parent_id = config["configurable"].get("checkpoint_id")
+        values = dict(checkpoint["channel_values"])
+        resolved = {}
+        for channel, parent in parents.items():
+            values[channel], depth = self._encode(checkpoint, channel, parent_id, parent)
+            resolved[channel] = (list(checkpoint["channel_values"][channel]), depth)
+        return {**checkpoint, "channel_values": values}, resolved
+
+    def _after_put(self, next_config: Dict[str, Any], resolved: Dict) -> None:
+        thread_id, checkpoint_ns = _thread(next_config)
+        checkpoint_id = next_config["configurable"]["checkpoint_id"]
+        for channel, (messages, depth) in resolved.items():
+            self._remember((thread_id, checkpoint_ns, checkpoint_id, channel), messages, depth)
+
+    # -- decoding (sync) ----------------------------------------------------
+
+    def _resolve_at(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                    channel: str) -> Optional[Tuple[list, int]]:
+        key = (thread_id, checkpoint_ns, checkpoint_id, channel)
+        entry = self._cached(key)
+        if entry is not None:
+            return entry
+        saved = self.saver.get_tuple(_checkpoint_config(thread_id, checkpoint_ns, checkpoint_id))
+        if saved is None or channel not in saved.checkpoint["channel_values"]:
+            return None
+        return self._resolve_value(key, saved.checkpoint["channel_values"][channel])
+
+    def _resolve_value(self, key: _CacheKey, value: Any) -> Tuple[list, int]:
+        entry = self._cached(key)
+        if entry is not None:
+            return entry
+        if is_delta(value):
+            thread_id, checkpoint_ns, _, channel = key
+            base = self._resolve_at(thread_id, checkpoint_ns, value["base"], channel)
+            if base is None:
+                raise ValueError(f"Missing base checkpoint {value['base']} of {key[2]}")
+            entry = (base[0][:value["base_len"]] + list(value["append"]), value["depth"])
+        else:
+            entry = (list(value), 0)
+        self._remember(key, *entry)
+        return entry
+
+    def _decode(self, saved: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if saved is None:
+            return None
+        values = saved.checkpoint.get("channel_values", {})
+        if not any(is_delta(values.get(ch)) for ch in self.channels):
+            return saved
+        thread_id, checkpoint_ns = _thread(saved.config)
+        checkpoint_id = saved.config["configurable"]["checkpoint_id"]
+        values = dict(values)
+        for channel in self.channels:
+            if is_delta(values.get(channel)):
+                key = (thread_id, checkpoint_ns, checkpoint_id, channel)
+                values[channel] = list(self._resolve_value(key, values[channel])[0])
+        return saved._replace(checkpoint={**saved.checkpoint, "channel_values": values})
+
+    # -- BaseCheckpointSaver (sync) -------------------------------------------
+
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        return self._decode(self.saver.get_tuple(config))
+
+    def list(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[Dict[str, Any]] = None,
+             limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        for saved in self.saver.list(config, filter=filter, before=before, limit=limit):
+            yield self._decode(saved)
+
+    def put(self, config: Dict[str, Any], checkpoint: Dict[str, Any],
+            metadata: Dict[str, Any], new_versions: Dict[str, Any]) -> Dict[str, Any]:
+        thread_id, checkpoint_ns = _thread(config)
+        parent_id = config["configurable"].get("checkpoint_id")
+        parents = {
+            channel: self._resolve_at(thread_id, checkpoint_ns, parent_id, channel)
+            if parent_id else None
+            for channel in self._encoded_channels(checkpoint, new_versions)
+        }
+        encoded, resolved = self._prepare_put(config, checkpoint, parents)
+        next_config = self.saver.put(config, encoded, metadata, new_versions)
+        self._after_put(next_config, resolved)
+        return next_config
+
+    def put_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]],
+                   task_id: str, task_path: str = "") -> None:
+        self.saver.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._forget_thread(thread_id)
+        self.saver.delete_thread(thread_id)
+
+    # -- decoding and BaseCheckpointSaver (async) -----------------------------
+
+    async def _aresolve_at(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                           channel: str) -> Optional[Tuple[list, int]]:
+        key = (thread_id, checkpoint_ns, checkpoint_id, channel)
+        entry = self._cached(key)
+        if entry is not None:
+            return entry
+        saved = await self.saver.aget_tuple(
+            _checkpoint_config(thread_id, checkpoint_ns, checkpoint_id))
+        if saved is None or channel not in saved.checkpoint["channel_values"]:
+            return None
+        return await self._aresolve_value(key, saved.checkpoint["channel_values"][channel])
+
+    async def _aresolve_value(self, key: _CacheKey, value: Any) -> Tuple[list, int]:
+        entry = self._cached(key)
+        if entry is not None:
+            return entry
+        if is_delta(value):
+            thread_id, checkpoint_ns, _, channel = key
+            base = await self._aresolve_at(thread_id, checkpoint_ns, value["base"], channel)
+            if base is None:
+                raise ValueError(f"Missing base checkpoint {value['base']} of {key[2]}")
+            entry = (base[0][:value["base_len"]] + list(value["append"]), value["depth"])
+        else:
+            entry = (list(value), 0)
+        self._remember(key, *entry)
+        return entry
+
+    async def _adecode(self, saved: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        if saved is None:
+            return None
+        values = saved.checkpoint.get("channel_values", {})
+        thread_id, checkpoint_ns = _thread(saved.config)
+        checkpoint_id = saved.config["configurable"]["checkpoint_id"]
+        for channel in self.channels:
+            if is_delta(values.get(channel)):
+                # resolve into the cache, then decode synchronously from it
+                key = (thread_id, checkpoint_ns, checkpoint_id, channel)
+                await self._aresolve_value(key, values[channel])
+        return self._decode(saved)
+
+    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        return await self._adecode(await self.saver.aget_tuple(config))
+
+    async def alist(self, config: Optional[Dict[str, Any]], *,
+                    filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[Dict[str, Any]] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        async for saved in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield await self._adecode(saved)
+
+    async def aput(self, config: Dict[str, Any], checkpoint: Dict[str, Any],
+                   metadata: Dict[str, Any], new_versions: Dict[str, Any]) -> Dict[str, Any]:
+        thread_id, checkpoint_ns = _thread(config)
+        parent_id = config["configurable"].get("checkpoint_id")
+        parents = {}
+        for channel in self._encoded_channels(checkpoint, new_versions):
+            parents[channel] = await self._aresolve_at(
+                thread_id, checkpoint_ns, parent_id, channel) if parent_id else None
+        encoded, resolved = self._prepare_put(config, checkpoint, parents)
+        next_config = await self.saver.aput(config, encoded, metadata, new_versions)
+        self._after_put(next_config, resolved)
+        return next_config
+
+    async def aput_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]],
+                          task_id: str, task_path: str = "") -> None:
+        await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self._forget_thread(thread_id)
+        await self.saver.adelete_thread(thread_id)
+
+    # -- tooling ------------------------------------------------------------
+
+    def chain_stats(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Describe how the history of a thread is stored.
+
+        Args:
+            config: Config with the thread_id (and optional checkpoint_ns)
+
+        Returns:
+            Dictionary with the number of checkpoints, snapshots and deltas
+            of the encoded channels, the deepest delta chain and the number
+            of messages stored across all of them
+        """
+        stats = {"checkpoints": 0, "snapshots": 0, "deltas": 0,
+                 "max_depth": 0, "stored_messages": 0}
+        seen_versions = set()
+        for saved in self.saver.list(config):
+            stats["checkpoints"] += 1
+            values = saved.checkpoint.get("channel_values", {})
+            versions = saved.checkpoint.get("channel_versions", {})
+            for channel in self.channels:
+                value = values.get(channel)
+                # checkpoints share the stored value of unchanged channels
+                if value is None or (channel, versions.get(channel)) in seen_versions:
+                    continue
+                seen_versions.add((channel, versions.get(channel)))
+                if is_delta(value):
+                    stats["deltas"] += 1
+                    stats["max_depth"] = max(stats["max_depth"], value["depth"])
+                    stats["stored_messages"] += len(value["append"])
+                else:
+                    stats["snapshots"] += 1
+                    stats["stored_messages"] += len(value)
+        return stats
+
+
+def compact_thread(source: BaseCheckpointSaver, target: DeltaCheckpointSaver, thread_id: str,
+                   target_thread_id: Optional[str] = None, checkpoint_ns: str = "") -> int:
+    """
+    Copy the history of a thread into a delta saver, re-encoding it.
+
+    Checkpoints keep their ids, versions, metadata and pending writes, and
+    are written oldest first, so every checkpoint becomes a delta of its
+    parent (or a snapshot, following the target's snapshot policy).
+
+    Args:
+        source: Saver holding the thread, e.g. the default PostgresSaver
+        target: Delta saver the thread is written to
+        thread_id: Thread to copy
+        target_thread_id: Thread id in the target, defaults to thread_id
+        checkpoint_ns: Checkpoint namespace to copy
+
+    Returns:
+        Number of checkpoints copied
+    """
+    target_thread_id = target_thread_id or thread_id
+    history = list(source.list({"configurable": {
+        "thread_id": thread_id, "checkpoint_ns": checkpoint_ns}}))
+    parent_versions: Dict[str, Dict[str, Any]] = {}
+    for saved in reversed(history):
+        checkpoint = saved.checkpoint
+        parent_id = saved.parent_config["configurable"]["checkpoint_id"] \
+            if saved.parent_config else None
+        previous = parent_versions.get(parent_id, {})
+        new_versions = {channel: version
+                        for channel, version in checkpoint["channel_versions"].items()
+                        if previous.get(channel) != version}
+        config = {"configurable": {"thread_id": target_thread_id,
+                                   "checkpoint_ns": checkpoint_ns}}
+        if parent_id:
+            config["configurable"]["checkpoint_id"] = parent_id
+        next_config = target.put(config, checkpoint, saved.metadata, new_versions)
+        writes_by_task = defaultdict(list)
+        for task_id, channel, value in saved.pending_writes or ():
+            writes_by_task[task_id].append((channel, value))
+        for task_id, writes in writes_by_task.items():
+            target.put_writes(next_config, writes, task_id)
+        parent_versions[checkpoint["id"]] = checkpoint["channel_versions"]
+    return len(history)
@@ -0,0 +1,92 @@
+"""
+Graph Cache Module
+
+This module caches graphs compiled from a LangGraph builder, so scripts that
+compile the same builder on every turn (e.g. hitl_sample_6) reuse one
+compiled graph.
+
+Graphs are keyed by the identity of the builder, the identity of the
+checkpointer and the other compile arguments. The builder and checkpointer
+are kept alive by their cache entry, so their ids cannot be reused by other
+objects while the entry exists. The key also records how many nodes, edges
+and branches the builder has, so adding to a builder after it was compiled
+produces a new graph instead of a stale one.
+
+Usage:
+    graph = compile_cached(builder, checkpointer=checkpointer)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+def _builder_shape(builder: Any) -> Tuple[int, ...]:
+    return tuple(len(getattr(builder, name, ()) or ())
+                 for name in ("nodes", "edges", "branches", "waiting_edges"))
+
+
+class BuilderGraphCache:
+    """
+    LRU cache of graphs compiled from builders.
+
+    Compilation happens outside the lock; if two threads miss on the same
+    key at once, the first stored graph wins.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # key -> (builder, checkpointer, graph)
+        self._graphs: "OrderedDict[Tuple, Tuple[Any, Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compile(self, builder: Any, checkpointer: Any = None, **compile_kwargs: Any):
+        """
+        Return the graph compiled from builder, compiling it on a miss.
+
+        Args:
+            builder: Graph or StateGraph builder
+            checkpointer: Checkpointer passed to compile
+            **compile_kwargs: Other compile arguments (interrupt_before, ...)
+
+        Returns:
+            The compiled graph
+        """
+        key = (id(builder), id(checkpointer), _builder_shape(builder),
+               tuple(sorted((k, repr(v)) for k, v in compile_kwargs.items())))
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is not None:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        graph = builder.compile(checkpointer=checkpointer, **compile_kwargs)
+
+        with self._lock:
+            entry = self._graphs.setdefault(key, (builder, checkpointer, graph))
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+        return entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {"size": len(self._graphs), "hits": self.hits, "misses": self.misses}
+
+
+# Shared cache used by compile_cached
+builder_graph_cache = BuilderGraphCache()
+
+
+def compile_cached(builder: Any, checkpointer: Any = None, **compile_kwargs: Any):
+    """Return the compiled graph of builder from the shared cache."""
+    return builder_graph_cache.get_or_compile(builder, checkpointer, **compile_kwargs)
@@ -11,6 +11,8 @@ from langgraph.types import interrupt, Command
 from langgraph.checkpoint.memory import MemorySaver
 
 from dotenv import load_dotenv
+from llm_cache import cached_client_kwargs
+from tool_cache import cached_tool, no_cache
 
 load_dotenv()
 
@@ -27,7 +29,8 @@ model = ChatOpenAI(
     model=model_name,
     verbose=True,
     timeout=30,   # 30-second timeout
-    max_retries=2  # Limit retries
+    max_retries=2,  # Limit retries
+    **cached_client_kwargs()  # Share the LLM response cache
 )
 
 # ------------------------------------------------------------------------------
@@ -36,6 +39,7 @@ model = ChatOpenAI(
 
 
 @tool
+@cached_tool(ttl=300)
 def get_data(query: str) -> str:
     """
     Simulates an API GET request to retrieve data based on the query.
@@ -52,6 +56,7 @@ def get_data(query: str) -> str:
 
 
 @tool
+@no_cache  # posts data and asks for confirmation on every call
 def post_data(payload: str) -> str:
     """
     Simulates an API POST request to send data.
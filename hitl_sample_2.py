@@ -6,10 +6,11 @@ import os
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from llm_cache import cached_client_kwargs
 
 load_dotenv()
 
-model = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+model = ChatOpenAI(model="gpt-4o-mini", temperature=0, **cached_client_kwargs())
 
 
 # For this tutorial we will use custom tool that returns pre-defined values for weather in two cities (NYC & SF)
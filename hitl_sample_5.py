@@ -6,6 +6,7 @@ import os
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from llm_cache import cached_client_kwargs
 from langgraph.prebuilt.chat_agent_executor import (
     AgentState,
 )
@@ -16,7 +17,7 @@ from langgraph.types import interrupt
 
 load_dotenv()
 
-model = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+model = ChatOpenAI(model="gpt-4o-mini", temperature=0, **cached_client_kwargs())
 memory = MemorySaver()
 
 
@@ -2,6 +2,7 @@ import os
 from typing import List
 
 from dotenv import load_dotenv
+from llm_cache import cached_client_kwargs
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
@@ -10,7 +11,7 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 load_dotenv()
 
 # Initialize the model
-model = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+model = ChatOpenAI(model="gpt-4o-mini", temperature=0, **cached_client_kwargs())
 
 # Define a simple weather tool
 @tool
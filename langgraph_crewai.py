@@ -9,6 +9,8 @@ from crewai import Agent, Task, Crew
 import logging
 
 from crewai.tools import tool
+from llm_cache import cached_client_kwargs, install_litellm_cache
+from tool_cache import cached_tool
 
 # Set up your OpenAI API key - replace with your actual key or use environment variable
 # os.environ["OPENAI_API_KEY"] = "your-api-key-here"
@@ -26,6 +28,7 @@ class AgentState(MessagesState):
 
 
 @tool("search on internet")
+@cached_tool(ttl=300)
 def search_on_internet(query: str) -> str:
     """this is to search on internet this tool get the query as a parameter and search on interent and return
     the result as a string"""
@@ -49,6 +52,9 @@ def search_on_internet(query: str) -> str:
     """
 
 
+# CrewAI calls OpenAI through litellm
+install_litellm_cache()
+
 researcher = Agent(
     role="Senior Research Analyst",
     goal="Uncover accurate and relevant information about the topic and provide a concise summary",
@@ -125,7 +131,8 @@ model = ChatOpenAI(
     model=model_name,
     verbose=True,
     timeout=30,  # Add a 30-second timeout
-    max_retries=2  # Limit retries
+    max_retries=2,  # Limit retries
+    **cached_client_kwargs()  # Share the LLM response cache
 )
 
 # Define a simple tool for the agent
@@ -1,10 +1,12 @@
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from langgraph.graph import StateGraph, START, END, Graph
+from langgraph.graph import StateGraph, START, END
 from langgraph.graph import MessagesState
 from langgraph.prebuilt import create_react_agent, AgentState
 from agentFrameworks import call_crew_agent, call_autogen_agent
+from llm_cache import cached_client_kwargs
+from tool_cache import cached_tool
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 
 from langgraph.graph import START, StateGraph
@@ -30,7 +32,8 @@ model = ChatOpenAI(
     model=model_name,
     verbose=True,
     timeout=30,  # Add a 30-second timeout
-    max_retries=2  # Limit retries
+    max_retries=2,  # Limit retries
+    **cached_client_kwargs()  # Share the LLM response cache
 )
 
 # Define a simple tool for the agent
@@ -71,6 +74,7 @@ def multiply(num1: int, num2: int) -> int:
 
 
 @tool
+@cached_tool(ttl=600)
 def get_user_info(phoneNumber: str) -> str:
     """
     Searches for user information based on the user phone number.
@@ -123,7 +127,8 @@ def call_react_agent(state: AgentState):
 # Create the graph
 
 
-builder = Graph()
+# StateGraph merges each node's message delta into the history
+builder = StateGraph(AgentState)
 
 # Add nodes
 builder.add_node("UserQueryProcessor", call_react_agent)
@@ -137,11 +142,13 @@ builder.add_edge("UsageAnalyzer", "RecommendationGenerator")
 builder.add_edge("RecommendationGenerator", END)
 
 graph = builder.compile()
-print("starting ............")
-result = graph.invoke({"messages": [
-    HumanMessage(
-        content="seems my data limit is over could you please suggest me a good package my number is 0713945222")
-]})
-
-msg = result["messages"]
-print(result["messages"][-1].content)
+
+if __name__ == "__main__":
+    print("starting ............")
+    result = graph.invoke({"messages": [
+        HumanMessage(
+            content="seems my data limit is over could you please suggest me a good package my number is 0713945222")
+    ]})
+
+    msg = result["messages"]
+    print(result["messages"][-1].content)
@@ -0,0 +1,323 @@
+"""
+LLM Response Cache Module
+
+This module implements one response cache shared by every framework in this
+repo. Caching happens at the HTTP layer of the OpenAI clients, which
+LangChain's ChatOpenAI, pydantic-ai, autogen and CrewAI (through litellm) all
+go through, so a replayed or repeated request never reaches the provider
+twice regardless of which framework sent it.
+
+Chat completion requests are keyed on their normalized messages, model,
+temperature, tools and the other sampling parameters. Streaming requests are
+passed through uncached.
+
+Backends:
+- MemoryBackend: in-process LRU
+- SQLiteBackend: on-disk, shared between processes and runs
+
+The shared cache is configured with environment variables:
+    LLM_CACHE_BACKEND  memory (default), sqlite or off
+    LLM_CACHE_PATH     SQLite file, defaults to .llm_cache.sqlite
+    LLM_CACHE_TTL      entry lifetime in seconds, unset = no expiry
+    LLM_CACHE_SIZE     maximum entries of the memory backend
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# Request parameters, besides the messages, that change the completion
+KEY_PARAMS = (
+    "model", "temperature", "tools", "tool_choice", "parallel_tool_calls",
+    "response_format", "top_p", "n", "seed", "stop", "max_tokens",
+    "max_completion_tokens", "frequency_penalty", "presence_penalty",
+)
+CACHED_PATH_SUFFIXES = ("/chat/completions",)
+
+
+def _normalize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {"role": message.get("role")}
+    content = message.get("content")
+    normalized["content"] = content.strip() if isinstance(content, str) else content
+    for field in ("name", "tool_calls", "tool_call_id"):
+        if message.get(field):
+            normalized[field] = message[field]
+    return normalized
+
+
+def cache_key(request_body: Dict[str, Any]) -> str:
+    """
+    Compute the cache key of a chat completion request body.
+
+    Args:
+        request_body: JSON body of an OpenAI chat completion request
+
+    Returns:
+        Hex encoded SHA-256 digest of the normalized request
+    """
+    normalized = {k: request_body[k] for k in KEY_PARAMS if request_body.get(k) is not None}
+    # OpenAI's default temperature, so an explicit 1 and a missing value match
+    temperature = request_body.get("temperature")
+    normalized["temperature"] = 1.0 if temperature is None else float(temperature)
+    if "tools" in normalized:
+        normalized["tools"] = sorted(
+            normalized["tools"], key=lambda t: json.dumps(t, sort_keys=True))
+    normalized["messages"] = [_normalize_message(m) for m in request_body.get("messages", [])]
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU backend."""
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """On-disk backend, safe to share between threads and processes."""
+
+    def __init__(self, path: str = ".llm_cache.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                with self._conn:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Cache of raw chat completion responses with hit-rate statistics.
+
+    Args:
+        backend: MemoryBackend, SQLiteBackend or any object with get/set
+        ttl: Lifetime of new entries in seconds, None keeps them forever
+    """
+
+    def __init__(self, backend: Any = None, ttl: Optional[float] = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.backend.set(key, value, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hits, misses, hit rate and number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.backend),
+            }
+
+
+def _cacheable_key(request: httpx.Request) -> Optional[str]:
+    if request.method != "POST" or not request.url.path.endswith(CACHED_PATH_SUFFIXES):
+        return None
+    try:
+        body = json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return None
+    if body.get("stream"):
+        return None
+    return cache_key(body)
+
+
+def _cached_response(request: httpx.Request, content: bytes) -> httpx.Response:
+    return httpx.Response(
+        200, headers={"content-type": "application/json", "x-llm-cache": "hit"},
+        content=content, request=request)
+
+
+class CachingTransport(httpx.BaseTransport):
+    """httpx transport serving chat completions from a ResponseCache."""
+
+    def __init__(self, cache: ResponseCache, transport: Optional[httpx.BaseTransport] = None):
+        self.cache = cache
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = _cacheable_key(request)
+        if key is not None:
+            content = self.cache.get(key)
+            if content is not None:
+                return _cached_response(request, content)
+        response = self._transport.handle_request(request)
+        if key is not None and response.status_code == 200:
+            self.cache.set(key, response.read())
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncCachingTransport(httpx.AsyncBaseTransport):
+    """Async httpx transport serving chat completions from a ResponseCache."""
+
+    def __init__(self, cache: ResponseCache, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cache = cache
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = _cacheable_key(request)
+        if key is not None:
+            content = self.cache.get(key)
+            if content is not None:
+                return _cached_response(request, content)
+        response = await self._transport.handle_async_request(request)
+        if key is not None and response.status_code == 200:
+            self.cache.set(key, await response.aread())
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[ResponseCache]:
+    """Return the shared cache configured from the environment, or None if off."""
+    global _shared_cache
+    backend_name = os.environ.get("LLM_CACHE_BACKEND", "memory").lower()
+    if backend_name == "off":
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            if backend_name == "sqlite":
+                backend = SQLiteBackend(os.environ.get("LLM_CACHE_PATH", ".llm_cache.sqlite"))
+            elif backend_name == "memory":
+                backend = MemoryBackend(int(os.environ.get("LLM_CACHE_SIZE", "10000")))
+            else:
+                raise ValueError(f"Unsupported LLM cache backend: {backend_name}")
+            ttl = os.environ.get("LLM_CACHE_TTL")
+            _shared_cache = ResponseCache(backend, ttl=float(ttl) if ttl else None)
+        return _shared_cache
+
+
+def cached_http_client(cache: Optional[ResponseCache] = None, **kwargs: Any) -> httpx.Client:
+    """Return an httpx.Client whose chat completions go through the cache."""
+    cache = cache or get_llm_cache()
+    if cache is None:
+        return httpx.Client(**kwargs)
+    return httpx.Client(transport=CachingTransport(cache), **kwargs)
+
+
+def cached_async_http_client(cache: Optional[ResponseCache] = None, **kwargs: Any) -> httpx.AsyncClient:
+    """Return an httpx.AsyncClient whose chat completions go through the cache."""
+    cache = cache or get_llm_cache()
+    if cache is None:
+        return httpx.AsyncClient(**kwargs)
+    return httpx.AsyncClient(transport=AsyncCachingTransport(cache), **kwargs)
+
+
+def cached_client_kwargs(cache: Optional[ResponseCache] = None) -> Dict[str, Any]:
+    """
+    Keyword arguments that make a LangChain ChatOpenAI use the cache.
+
+    Example:
+        model = ChatOpenAI(model="gpt-4o-mini", **cached_client_kwargs())
+    """
+    return {
+        "http_client": cached_http_client(cache),
+        "http_async_client": cached_async_http_client(cache),
+    }
+
+
+def cached_openai_model(model_name: str, cache: Optional[ResponseCache] = None):
+    """Return a pydantic-ai OpenAIModel whose requests go through the cache."""
+    from openai import AsyncOpenAI
+    from pydantic_ai.models.openai import OpenAIModel
+
+    return OpenAIModel(model_name, openai_client=AsyncOpenAI(
+        http_client=cached_async_http_client(cache)))
+
+
+def install_litellm_cache(cache: Optional[ResponseCache] = None) -> None:
+    """Route litellm's (and therefore CrewAI's) OpenAI calls through the cache."""
+    import litellm
+
+    litellm.client_session = cached_http_client(cache)
+    litellm.aclient_session = cached_async_http_client(cache)
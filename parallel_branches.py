@@ -0,0 +1,96 @@
+"""
+Parallel Branches Module
+
+Helpers for running independent nodes of a LangGraph graph concurrently and
+joining them deterministically.
+
+Branch nodes do not write to `messages` directly. Each one stores its message
+delta under its own name in the `branch_messages` channel. The join node then
+appends the deltas to `messages` in the declared branch order. The resulting
+history is therefore the same no matter which branch finishes first.
+
+Branch nodes may be plain or async functions. Sync branches run in
+LangGraph's thread pool; async branches overlap only when the graph is run
+with ainvoke/astream.
+
+Usage:
+    class State(MessagesState):
+        branch_messages: Annotated[dict, merge_branch_messages]
+
+    builder.add_node("usage", branch("usage", call_usage))
+    builder.add_node("catalogue", branch("catalogue", call_catalogue))
+    builder.add_node("join", join_branches(["usage", "catalogue"]))
+    builder.add_edge("start", "usage")
+    builder.add_edge("start", "catalogue")
+    builder.add_edge(["usage", "catalogue"], "join")
+"""
+
+import inspect
+from typing import Any, Callable, Dict, List, Optional
+
+
+def merge_branch_messages(current: Optional[Dict[str, list]],
+                          update: Optional[Dict[str, list]]) -> Dict[str, list]:
+    """Reducer of the branch_messages channel, an empty update clears it."""
+    if not update:
+        return {}
+    merged = dict(current or {})
+    merged.update(update)
+    return merged
+
+
+def _as_list(messages: Any) -> list:
+    if messages is None:
+        return []
+    return messages if isinstance(messages, list) else [messages]
+
+
+def branch(name: str, node: Callable[[Any], Dict[str, Any]]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Wrap a node so its message delta is stored as the output of a branch.
+
+    Args:
+        name: Branch name, used as key in branch_messages
+        node: Node function or coroutine function returning
+            {"messages": delta}, it receives the RunnableConfig if it takes a
+            `config` argument
+
+    Returns:
+        Node function returning {"branch_messages": {name: delta}}, a
+        coroutine function if `node` is one
+    """
+    takes_config = "config" in inspect.signature(node).parameters
+
+    def to_branch(update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        update = dict(update or {})
+        delta = _as_list(update.pop("messages", None))
+        update["branch_messages"] = {name: delta}
+        return update
+
+    if inspect.iscoroutinefunction(node):
+        async def run_branch(state: Any, config: Optional[dict] = None) -> Dict[str, Any]:
+            return to_branch(await (node(state, config=config) if takes_config else node(state)))
+    else:
+        def run_branch(state: Any, config: Optional[dict] = None) -> Dict[str, Any]:
+            return to_branch(node(state, config=config) if takes_config else node(state))
+
+    run_branch.__name__ = f"branch_{name}"
+    return run_branch
+
+
+def join_branches(order: List[str]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Build the node that merges branch deltas into the message history.
+
+    Args:
+        order: Branch names in the order their messages are appended
+
+    Returns:
+        Node function appending the branch deltas and clearing branch_messages
+    """
+    def join(state: Any) -> Dict[str, Any]:
+        outputs = state.get("branch_messages") or {}
+        messages = [m for name in order for m in outputs.get(name, [])]
+        return {"messages": messages, "branch_messages": {}}
+
+    return join
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from pydantic_ai import Agent
+from llm_cache import cached_openai_model
 
 # Load environment variables from .env file (if you have one)
 load_dotenv()
@@ -11,7 +12,7 @@ def main():
     """
     # Create a new agent with gpt-4o-mini model
     agent = Agent(
-        'openai:gpt-4o-mini',  # Using the gpt-4o-mini model
+        cached_openai_model('gpt-4o-mini'),  # gpt-4o-mini through the shared LLM response cache
         system_prompt="You are a helpful assistant that provides clear and concise information.",
     )
 
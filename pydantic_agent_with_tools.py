@@ -2,6 +2,7 @@ import os
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from pydantic_ai import Agent, RunContext
+from llm_cache import cached_openai_model
 
 # Load environment variables from .env file (if you have one)
 load_dotenv()
@@ -12,7 +13,7 @@ def main():
     """
     # Create a new agent with gpt-4o-mini model
     agent = Agent(
-        'openai:gpt-4o-mini',  # Using the gpt-4o-mini model
+        cached_openai_model('gpt-4o-mini'),  # gpt-4o-mini through the shared LLM response cache
         system_prompt="""You are a helpful assistant with access to various tools.
         Use these tools to provide the most accurate and helpful responses to user queries.
         When using tools, make sure to interpret their results correctly.""",
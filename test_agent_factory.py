@@ -5,8 +5,38 @@ This script demonstrates how to use the agent factory to generate agent code
 based on different frameworks.
 """
 
+import asyncio
+import copy
+import io
 import json
-from agent_factory import generate_agent_code, parse_agent_json
+import os
+import tempfile
+import time
+
+import pytest
+from agent_batch_generator import generate_batch_stream
+from agent_code_service import AgentCodeClient, AgentCodeService
+from agentFrameworks.executor import run_blocking, run_pooled, submit_blocking
+from agentFrameworks.pool import InstancePool
+from agentFrameworks.streaming import NodeMessageStream, autogen_token_iostream
+from agent_factory import (
+    AgentCodeCache,
+    AgentFactoryRegistry,
+    CrewAIAgentFactory,
+    config_hash,
+    generate_agent_code,
+    generate_compiled_agent,
+    load_agent_artifact,
+    source_hash,
+    parse_agent_json,
+)
+from checkpointer_service import CheckpointerService
+from conversation_server import ConversationClient, ConversationServer
+from graph_cache import BuilderGraphCache
+from parallel_branches import branch, join_branches, merge_branch_messages
+from tool_cache import cache_tools, cached_tool, no_cache
+from workflow_generator import IncrementalWorkflowGenerator
+from workflow_parser import parse_workflow
 
 
 def test_crewai_agent():
@@ -53,6 +83,844 @@ def test_pydantic_agent():
     print("=============================")
 
 
+def test_agent_code_cache():
+    """Test that identical configs are served from the cache."""
+    cache = AgentCodeCache(max_size=2)
+    factory = CrewAIAgentFactory()
+    config_a = {"framework": "crewai", "role": "A", "tools": ["x"]}
+    config_b = {"tools": ["x"], "role": "A", "framework": "CrewAI"}
+
+    assert config_hash(config_a) == config_hash(config_b)
+    first = cache.get_or_create(factory, config_a)
+    second = cache.get_or_create(factory, config_b)
+    assert first == second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    cache.get_or_create(factory, {"framework": "crewai", "role": "B"})
+    cache.get_or_create(factory, {"framework": "crewai", "role": "C"})
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+    # a caller-supplied key skips hashing the config
+    keyed = cache.get_or_create(factory, config_a, key="agent-a:1")
+    assert cache.get_or_create(factory, {"role": "ignored"}, key="agent-a:1") == keyed
+
+
+def test_batch_generation():
+    """Test that batch results keep input order and record per-line errors."""
+    lines = [
+        json.dumps({"id": 1, "agent": {"framework": "crewai", "role": "A"}}),
+        "",
+        "{not json",
+        json.dumps({"id": 3, "framework": "unknown"}),
+        json.dumps({"id": 4, "framework": "pydantic-ai", "tools": ["t"]}),
+    ]
+    for workers in (0, 2):
+        output = io.StringIO()
+        summary = generate_batch_stream(lines, output, workers=workers, chunk_size=2)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        assert summary == {"total": 4, "ok": 2, "errors": 2}
+        assert [r["line"] for r in records] == [1, 3, 4, 5]
+        assert "code" in records[0] and "error" in records[1]
+        assert records[2]["error"] == "Unsupported framework: unknown"
+        assert records[3]["id"] == 4
+
+
+def test_incremental_workflow_generation():
+    """Test that only changed workflow nodes are regenerated."""
+    with open("json_data/workflow_v2.json", "r") as f:
+        workflow = parse_workflow(f)
+
+    generator = IncrementalWorkflowGenerator()
+    generator.generate(workflow)
+    assert generator.last_regenerated == [
+        "supervisor", "assignment_agent", "confirmation_agent"]
+    # one agent per node, imports once at the top
+    namespace = {}
+    fragments = "\n".join(generator.fragment(node_id) for node_id in generator.manifest)
+    exec(fragments, {"crewai": type("crewai", (), {"Agent": dict})}, namespace)
+    assert namespace["agent_assignment_agent"]["role"] == "Sales Assignment Agent"
+    assert {"agent_supervisor", "agent_confirmation_agent"} <= set(namespace)
+    assert generator.output().startswith("import crewai\n\n")
+    assert generator.output().count("import crewai") == 1
+
+    changed = copy.deepcopy(workflow)
+    changed["nodes"][1]["prompt"] = "You assign leads round robin."
+    code = generator.generate(changed)
+    assert generator.last_regenerated == ["assignment_agent"]
+    assert "You assign leads round robin." in code
+    assert code == IncrementalWorkflowGenerator().generate(changed)
+
+    del changed["nodes"][0]
+    generator.generate(changed)
+    assert generator.last_regenerated == []
+    assert list(generator.manifest) == ["assignment_agent", "confirmation_agent"]
+
+
+def test_lazy_init_code():
+    """Test that lazyInit code compiles and imports no framework at load."""
+    for framework in ("crewai", "pydantic-ai"):
+        agent_code = generate_agent_code({
+            "framework": framework,
+            "tools": ["search_wikipedia"],
+            "lazyInit": True,
+        })
+        namespace = {}
+        exec(compile(agent_code, "<generated>", "exec"), namespace)
+        assert namespace["_agent"] is None
+        assert callable(namespace["get_agent"])
+
+
+def test_compiled_agent_artifact():
+    """Test that compiled artifacts round-trip and bad syntax is rejected."""
+    agent_config = {"framework": "crewai", "role": "A", "lazyInit": True}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        code_object = generate_compiled_agent(agent_config, cache_dir=cache_dir)
+        path = os.path.join(cache_dir, source_hash(generate_agent_code(agent_config)) + ".pyc")
+        assert load_agent_artifact(path) == code_object
+
+    broken = {"framework": "crewai", "role": 'say "hi"'}
+    try:
+        generate_agent_code(broken, validate=True)
+    except ValueError as e:
+        assert "invalid syntax" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_factory_registry_lazy_import():
+    """Test that string targets are imported on first use only."""
+    registry = AgentFactoryRegistry()
+    registry.register("crewai-copy", "agent_factory:CrewAIAgentFactory", aliases=["crew"])
+    assert registry._instances == {}
+
+    factory = registry.get("CREW")
+    assert isinstance(factory, CrewAIAgentFactory)
+    assert registry.get("crewai-copy") is factory
+
+    try:
+        registry.get("autogen")
+    except ValueError as e:
+        assert str(e) == "Unsupported framework: autogen"
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_code_service_coalesces_inflight_requests():
+    """Test that concurrent identical configs are rendered once."""
+    def slow_generate(agent_config):
+        time.sleep(0.05)
+        return generate_agent_code(agent_config, use_cache=False)
+
+    async def run():
+        service = AgentCodeService(generate=slow_generate)
+        config = {"framework": "crewai", "role": "A"}
+        results = await asyncio.gather(*[service.generate(dict(config)) for _ in range(50)])
+        assert len(set(results)) == 1
+        metrics = service.metrics()
+        assert metrics["computations"] == 1
+        assert metrics["coalesced"] == 49
+
+        server = await service.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server, AgentCodeClient(port=port) as client:
+            assert await client.generate(config) == results[0]
+            try:
+                await client.generate({"framework": "unknown"})
+            except ValueError as e:
+                assert str(e) == "Unsupported framework: unknown"
+            else:
+                raise AssertionError("expected ValueError")
+            assert (await client.metrics())["requests"] == 52
+            # larger than asyncio's 64 KiB default line limit
+            large = {"framework": "crewai", "role": "A", "systemPrompt": "x" * 100_000}
+            assert "x" * 100_000 in await client.generate(large)
+
+        server = await service.serve(port=0, limit=1024)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection(port=port)
+            writer.write(json.dumps({"agent": {"systemPrompt": "x" * 5000}}).encode() + b"\n")
+            writer.write(b'{"op": "metrics"}\n')
+            assert json.loads(await reader.readline()) == {"error": "Line too long"}
+            assert "metrics" in json.loads(await reader.readline())
+            writer.close()
+
+    asyncio.run(run())
+
+
+def test_parallel_branches_join_in_declared_order():
+    """Branch deltas are merged in declared order, whichever finishes first"""
+    usage = branch("usage", lambda state: {"messages": ["usage report"]})
+    catalogue = branch("catalogue", lambda state: {"messages": "packages"})
+
+    channel = {}
+    # catalogue completes before usage
+    for update in (catalogue({}), usage({})):
+        channel = merge_branch_messages(channel, update["branch_messages"])
+    assert channel == {"usage": ["usage report"], "catalogue": ["packages"]}
+
+    joined = join_branches(["usage", "catalogue"])({"branch_messages": channel})
+    assert joined["messages"] == ["usage report", "packages"]
+    assert merge_branch_messages(channel, joined["branch_messages"]) == {}
+
+
+def test_async_branches_run_concurrently():
+    """Coroutine nodes stay coroutines and overlap under ainvoke"""
+    graph_module = pytest.importorskip("langgraph.graph")
+    from typing import Annotated
+    from typing_extensions import TypedDict
+
+    class State(TypedDict):
+        messages: list
+        branch_messages: Annotated[dict, merge_branch_messages]
+
+    def slow(text):
+        async def node(state, config=None):
+            await asyncio.sleep(0.2)
+            return {"messages": [text]}
+        return node
+
+    builder = graph_module.StateGraph(State)
+    builder.add_node("usage", branch("usage", slow("usage report")))
+    builder.add_node("catalogue", branch("catalogue", slow("packages")))
+    builder.add_node("join", join_branches(["usage", "catalogue"]))
+    builder.add_edge(graph_module.START, "usage")
+    builder.add_edge(graph_module.START, "catalogue")
+    builder.add_edge(["usage", "catalogue"], "join")
+    graph = builder.compile()
+    assert asyncio.iscoroutinefunction(branch("usage", slow("x")))
+
+    started = time.perf_counter()
+    result = asyncio.run(graph.ainvoke({"messages": [], "branch_messages": {}}))
+    assert result["messages"] == ["usage report", "packages"]
+    assert time.perf_counter() - started < 0.35
+
+
+def test_tool_result_cache():
+    """Deterministic tools are cached per normalized arguments, others are not"""
+    calls = []
+
+    @cached_tool(ttl=0.05, max_size=2)
+    def get_user_info(phoneNumber: str, detailed: bool = False) -> str:
+        """Look up a user."""
+        calls.append(phoneNumber)
+        return f"user {phoneNumber}"
+
+    assert get_user_info.__doc__ == "Look up a user."
+    assert get_user_info("0713") == get_user_info(" 0713 ") == get_user_info(phoneNumber="0713", detailed=False)
+    assert calls == ["0713"]
+    assert get_user_info.tool_cache.stats()["hits"] == 2
+
+    time.sleep(0.06)
+    get_user_info("0713")
+    assert calls == ["0713", "0713"]
+
+    @no_cache
+    def post_data(payload: str) -> str:
+        calls.append(payload)
+        return "ok"
+
+    class Tool:
+        def __init__(self, name, func):
+            self.name, self.func, self.coroutine = name, func, None
+
+    @cached_tool()
+    async def search(query: str) -> str:
+        calls.append(query)
+        return query.upper()
+
+    original = Tool("lookup", lambda userId: calls.append(userId) or userId)
+    lookup, post = cache_tools([original, Tool("post", post_data)])
+    assert post.func is post_data and original.func is not lookup.func
+    lookup.func("42"), lookup.func("42"), post.func("x"), post.func("x")
+    assert asyncio.run(search("ai")) == asyncio.run(search("ai")) == "AI"
+    assert calls[2:] == ["42", "x", "x", "ai"]
+
+
+def test_checkpointer_service_sets_up_once():
+    """The pooled checkpointer is set up once and shared across turns"""
+    class Connection:
+        def __init__(self, pool):
+            self.pool = pool
+
+        def __enter__(self):
+            if self.pool.down:
+                raise ConnectionError("server closed the connection")
+            self.pool.checkouts += 1
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, query):
+            return query
+
+    class Pool:
+        def __init__(self, conn_string, min_size, max_size, timeout):
+            self.max_size, self.checkouts, self.down, self.closed = max_size, 0, False, False
+
+        def connection(self, timeout=None):
+            return Connection(self)
+
+        def get_stats(self):
+            return {"pool_max": self.max_size, "requests_num": self.checkouts}
+
+        def close(self):
+            self.closed = True
+
+    class Saver:
+        setups = 0
+
+        def __init__(self, pool):
+            self.pool = pool
+
+        def setup(self):
+            Saver.setups += 1
+
+    service = CheckpointerService("postgresql://stand-in", max_size=4,
+                                  pool_factory=Pool, saver_factory=Saver)
+    assert not service.started
+    checkpointers = {id(service.checkpointer) for _ in range(10)}
+    assert len(checkpointers) == 1 and Saver.setups == 1
+
+    assert service.health_check()["ok"]
+    service.checkpointer.pool.down = True
+    health = service.health_check()
+    assert not health["ok"] and "closed" in health["error"]
+    metrics = service.metrics()
+    assert metrics["setup_runs"] == 1 and metrics["failed_health_checks"] == 1
+    assert metrics["pool"] == {"pool_max": 4, "requests_num": 1}
+
+    pool = service.checkpointer.pool
+    service.close()
+    assert pool.closed and not service.started
+
+
+def test_retention_keeps_delta_encoded_threads_whole():
+    """keep_last leaves threads written by DeltaCheckpointSaver readable"""
+    conn_string = os.environ.get("LANGGRAPH_TEST_DB_URI")
+    if not conn_string:
+        pytest.skip("LANGGRAPH_TEST_DB_URI is not set")
+    pytest.importorskip("langgraph.checkpoint.postgres")
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.graph import END, START, MessagesState, StateGraph
+
+    from checkpoint_retention import CheckpointRetentionJob, RetentionPolicy
+    from delta_checkpointer import DeltaCheckpointSaver
+
+    def reply(state):
+        return {"messages": [AIMessage(content=f"reply {len(state['messages'])}")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+
+    service = CheckpointerService(conn_string, max_size=2)
+    threads = {"delta": "retention-delta", "plain": "retention-plain"}
+    savers = {"delta": DeltaCheckpointSaver(service.checkpointer, snapshot_every=50),
+              "plain": service.checkpointer}
+    try:
+        with service.pool.connection() as conn:
+            for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ANY(%s)",
+                             (list(threads.values()),))
+        for kind, saver in savers.items():
+            graph = builder.compile(checkpointer=saver)
+            config = {"configurable": {"thread_id": threads[kind]}}
+            for i in range(6):
+                graph.invoke({"messages": [HumanMessage(content=f"q{i}")]}, config)
+
+        written = {kind: len(list(saver.list({"configurable": {"thread_id": threads[kind]}})))
+                   for kind, saver in savers.items()}
+        job = CheckpointRetentionJob(service.pool, RetentionPolicy(keep_last=2))
+        report = job.run_once()
+        assert report.threads_delta_encoded >= 1
+        assert report.as_dict()["threads_delta_encoded"] == report.threads_delta_encoded
+
+        for kind, saver in savers.items():
+            config = {"configurable": {"thread_id": threads[kind]}}
+            history = list(saver.list(config))
+            assert len(history) == (2 if kind == "plain" else written[kind])
+            state = builder.compile(checkpointer=saver).get_state(config)
+            assert len(state.values["messages"]) == 12
+    finally:
+        with service.pool.connection() as conn:
+            for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ANY(%s)",
+                             (list(threads.values()),))
+        service.close()
+
+
+def _reply_graph(checkpointer, remove_first_at=None):
+    """MessagesState graph answering every turn, optionally removing the first message."""
+    graph_module = pytest.importorskip("langgraph.graph")
+    from langchain_core.messages import AIMessage, RemoveMessage
+
+    def reply(state):
+        messages = state["messages"]
+        update = [AIMessage(content=f"reply {len(messages)}")]
+        if remove_first_at is not None and len(messages) == remove_first_at:
+            update.insert(0, RemoveMessage(id=messages[0].id))
+        return {"messages": update}
+
+    builder = graph_module.StateGraph(graph_module.MessagesState)
+    builder.add_node("reply", reply)
+    builder.add_edge(graph_module.START, "reply")
+    builder.add_edge("reply", graph_module.END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _contents(state):
+    return [message.content for message in state.values.get("messages", [])]
+
+
+def _chat(graph, thread_id, turns):
+    from langchain_core.messages import HumanMessage
+
+    config = {"configurable": {"thread_id": thread_id}}
+    for i in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"q{i}")]}, config)
+    return config
+
+
+def test_delta_checkpointer_matches_plain_saver():
+    """State and history read through deltas equal the plain saver's"""
+    memory = pytest.importorskip("langgraph.checkpoint.memory")
+    from delta_checkpointer import DeltaCheckpointSaver
+
+    plain = _reply_graph(memory.InMemorySaver())
+    inner = memory.InMemorySaver()
+    delta = DeltaCheckpointSaver(inner, snapshot_every=3)
+    config = _chat(_reply_graph(delta), "t", 8)
+    _chat(plain, "t", 8)
+    assert delta.deltas_written > 0 and delta.snapshots_written > 1
+
+    # a new saver on the same storage resolves every delta from scratch
+    cold = _reply_graph(DeltaCheckpointSaver(inner, snapshot_every=3))
+    assert _contents(cold.get_state(config)) == _contents(plain.get_state(config))
+    assert len(_contents(cold.get_state(config))) == 16
+    assert [_contents(s) for s in cold.get_state_history(config)] == \
+        [_contents(s) for s in plain.get_state_history(config)]
+
+
+def test_delta_checkpointer_snapshots_removed_messages():
+    """A RemoveMessage edit is stored as a snapshot and read back correctly"""
+    memory = pytest.importorskip("langgraph.checkpoint.memory")
+    from delta_checkpointer import DeltaCheckpointSaver
+
+    inner = memory.InMemorySaver()
+    delta = DeltaCheckpointSaver(inner, snapshot_every=50)
+    config = _chat(_reply_graph(delta, remove_first_at=5), "t", 4)
+    # the start checkpoint and the one written after the removal
+    assert delta.snapshots_written == 2
+
+    plain = _reply_graph(memory.InMemorySaver(), remove_first_at=5)
+    _chat(plain, "t", 4)
+    cold = _reply_graph(DeltaCheckpointSaver(inner))
+    assert _contents(cold.get_state(config)) == _contents(plain.get_state(config))
+    assert _contents(cold.get_state(config))[0] == "reply 1"
+
+
+def test_delta_checkpointer_forks_from_older_checkpoint():
+    """Resuming from an older checkpoint builds deltas on that checkpoint"""
+    memory = pytest.importorskip("langgraph.checkpoint.memory")
+    from langchain_core.messages import HumanMessage
+    from delta_checkpointer import DeltaCheckpointSaver
+
+    inner = memory.InMemorySaver()
+    graph = _reply_graph(DeltaCheckpointSaver(inner, snapshot_every=10))
+    config = _chat(graph, "t", 4)
+    older = next(s for s in graph.get_state_history(config) if len(_contents(s)) == 4)
+
+    graph.invoke({"messages": [HumanMessage(content="fork")]}, older.config)
+    cold = _reply_graph(DeltaCheckpointSaver(inner, snapshot_every=10))
+    assert _contents(cold.get_state(config)) == [
+        "q0", "reply 1", "q1", "reply 3", "fork", "reply 5"]
+    # the checkpoint the fork started from is unchanged
+    assert _contents(cold.get_state(older.config)) == ["q0", "reply 1", "q1", "reply 3"]
+
+
+def test_compact_thread_and_chain_stats():
+    """compact_thread re-encodes a plain thread as deltas, chain_stats describes it"""
+    memory = pytest.importorskip("langgraph.checkpoint.memory")
+    from delta_checkpointer import DeltaCheckpointSaver, compact_thread
+
+    source = memory.InMemorySaver()
+    plain = _reply_graph(source)
+    config = _chat(plain, "t", 6)
+
+    target = DeltaCheckpointSaver(memory.InMemorySaver(), snapshot_every=4)
+    copied = compact_thread(source, target, "t", target_thread_id="t2")
+    assert copied == len(list(source.list(config)))
+
+    config2 = {"configurable": {"thread_id": "t2"}}
+    compacted = _reply_graph(DeltaCheckpointSaver(target.saver, snapshot_every=4))
+    assert _contents(compacted.get_state(config2)) == _contents(plain.get_state(config))
+
+    stats = target.chain_stats(config2)
+    assert stats["checkpoints"] == copied
+    assert stats["snapshots"] >= 2 and stats["deltas"] > stats["snapshots"]
+    assert 0 < stats["max_depth"] < 4
+    # every message is stored once per snapshot, not once per checkpoint
+    stored_plain = sum(len(_contents(s)) for s in plain.get_state_history(config))
+    assert stats["stored_messages"] < stored_plain / 2
+
+    # the compacted thread keeps going
+    _chat(compacted, "t2", 1)
+    assert len(_contents(compacted.get_state(config2))) == 14
+
+
+def test_builder_graph_cache():
+    """Graphs are reused per builder and checkpointer, and rebuilt after changes"""
+    class Builder:
+        def __init__(self):
+            self.nodes, self.edges, self.compiles = {}, set(), 0
+
+        def compile(self, checkpointer=None, **kwargs):
+            self.compiles += 1
+            return ("graph", self.compiles, checkpointer)
+
+    builder, saver = Builder(), object()
+    cache = BuilderGraphCache()
+    first = cache.get_or_compile(builder, saver)
+    assert all(cache.get_or_compile(builder, saver) is first for _ in range(5))
+    assert cache.get_or_compile(builder, object()) is not first
+    assert cache.get_or_compile(builder, saver, interrupt_before=["a"]) is not first
+
+    builder.nodes["late"] = None
+    assert cache.get_or_compile(builder, saver) is not first
+    assert builder.compiles == 4
+    assert cache.stats() == {"size": 4, "hits": 5, "misses": 4}
+
+
+def test_compiled_graph_cache(monkeypatch):
+    """Workflow specs compile once per version and checkpointer, without network calls"""
+    pytest.importorskip("langchain_openai")
+    requests = pytest.importorskip("requests")
+    from workflow_compiler import CompiledGraphCache, compile_workflow
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("compiling a workflow must not call the network")
+
+    monkeypatch.setattr(requests.Session, "request", no_network)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with open("json_data/workflow_v2.json", "r") as f:
+        spec = parse_workflow(f)
+
+    cache = CompiledGraphCache()
+    first = cache.get_or_compile(spec)
+    assert {"supervisor", "assignment_agent", "confirmation_agent"} <= set(first.get_graph().nodes)
+    assert cache.get_or_compile(spec) is first
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    # another checkpointer or an edited spec is a different entry
+    checkpointer = pytest.importorskip("langgraph.checkpoint.memory").InMemorySaver()
+    assert cache.get_or_compile(spec, checkpointer=checkpointer) is not first
+    edited = copy.deepcopy(spec)
+    edited["nodes"][0]["prompt"] = "Route every lead to confirmation_agent."
+    assert cache.get_or_compile(edited) is not first
+    assert cache.stats()["size"] == 3
+
+    cache.invalidate("sales_lead_assignment_flow")
+    assert cache.stats()["size"] == 0
+    assert cache.get_or_compile(spec) is not first
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 4}
+
+    bad = copy.deepcopy(spec)
+    bad["nodes"][1]["tools"] = ["missing_tool"]
+    with pytest.raises(ValueError, match="unknown tool missing_tool"):
+        compile_workflow(bad)
+
+
+def test_pooled_instance_discarded_after_timeout():
+    """An instance whose call outlives the timeout is not handed out again"""
+    built, resets = [], []
+
+    def build():
+        built.append({"busy": False})
+        return built[-1]
+
+    def slow_call(instance, seconds):
+        instance["busy"] = True
+        time.sleep(seconds)
+        instance["busy"] = False
+        return "done"
+
+    async def run():
+        pool = InstancePool(build, size=1, reset=resets.append)
+        first = pool.checkout()
+        assert await run_pooled(pool, first, submit_blocking(slow_call, first, 0), 1) == "done"
+        assert resets == [first] and pool.checkout() is first
+
+        try:
+            await run_pooled(pool, first, submit_blocking(slow_call, first, 0.2), 0.01)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected TimeoutError")
+        assert first["busy"] and resets == [first]
+        second = pool.checkout(timeout=1)
+        assert second is not first and len(built) == 2
+        assert pool.metrics()["replaced"] == 1
+
+    asyncio.run(run())
+
+
+def test_run_blocking_and_run_pooled_timeouts():
+    """Timed-out calls raise TimeoutError and their late results are not pooled"""
+    finished, resets = [], []
+
+    def slow(seconds):
+        time.sleep(seconds)
+        finished.append(seconds)
+        return seconds
+
+    async def slow_async(instance):
+        try:
+            await asyncio.sleep(1)
+        finally:
+            instance["cancelled"] = True
+
+    async def run():
+        assert await run_blocking(slow, 0, timeout=1) == 0
+        with pytest.raises(asyncio.TimeoutError):
+            await run_blocking(slow, 0.2, timeout=0.01)
+
+        pool = InstancePool(dict, size=1, reset=resets.append)
+        # a coroutine call is cancelled and its instance discarded
+        instance = await pool.acheckout(1)
+        with pytest.raises(asyncio.TimeoutError):
+            await run_pooled(pool, instance, slow_async(instance), timeout=0.01)
+        assert instance["cancelled"] and resets == []
+
+        # a thread call finishes after the timeout, its result goes nowhere
+        instance = await pool.acheckout(1)
+        with pytest.raises(asyncio.TimeoutError):
+            await run_pooled(pool, instance, submit_blocking(slow, 0.1), timeout=0.01)
+        await asyncio.sleep(0.2)
+        assert 0.1 in finished and resets == []
+        replacement = await pool.acheckout(1)
+        assert replacement is not instance and pool.metrics()["replaced"] == 2
+        pool.checkin(replacement)
+
+        # cancelling the caller discards the instance as well
+        instance = await pool.acheckout(1)
+        task = asyncio.ensure_future(run_pooled(pool, instance, slow_async(instance), timeout=1))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert instance["cancelled"] and pool.metrics()["replaced"] == 3
+
+    asyncio.run(run())
+
+
+def test_pool_checkout_timeout_does_not_leak_instances():
+    """An acheckout that times out leaves every instance in the pool"""
+    built = []
+
+    def build():
+        built.append(object())
+        return built[-1]
+
+    async def hold(pool, seconds):
+        instance = await pool.acheckout(1)
+        await asyncio.sleep(seconds)
+        pool.checkin(instance)
+
+    async def run():
+        pool = InstancePool(build, size=1)
+        holder = asyncio.ensure_future(hold(pool, 0.3))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await pool.acheckout(0.1)
+        await holder
+        assert pool.metrics()["available"] == 1 and pool.metrics()["waiting"] == 0
+
+        # a waiter woken by checkin gets the instance, and so does the next caller
+        holder = asyncio.ensure_future(hold(pool, 0.05))
+        await asyncio.sleep(0)
+        instance = await pool.acheckout(1)
+        pool.checkin(instance)
+        await holder
+        assert await pool.acheckout(0.1) is instance
+
+        # a discarded instance is rebuilt by the next acheckout
+        pool.discard(instance)
+        replacement = await pool.acheckout(1)
+        assert replacement is not instance and len(built) == 2
+
+    asyncio.run(run())
+
+
+def test_context_window_summary_boundary():
+    """The summary boundary only moves forward and the summary is reused until it does"""
+    from agentFrameworks.context_window import ContextWindowManager
+
+    calls = []
+
+    def summarizer(previous, messages):
+        calls.append([m["content"] for m in messages])
+        return " ".join(filter(None, [previous, "+".join(m["content"] for m in messages)]))
+
+    manager = ContextWindowManager(token_budget=3, summarizer=summarizer,
+                                   count_tokens=lambda message: 1)
+    history = [{"role": "user", "content": f"m{i}"} for i in range(8)]
+
+    def contents(carryover):
+        return [m["content"] for m in carryover]
+
+    # within the budget nothing is summarized
+    assert manager.build_carryover("t", history[:3]) == history[:3]
+    assert calls == []
+
+    carryover = manager.build_carryover("t", history[:5])
+    assert contents(carryover) == [
+        "Summary of the earlier conversation: m0+m1", "m2", "m3", "m4"]
+    assert calls == [["m0", "m1"]]
+    # the same history reuses the summary
+    assert manager.build_carryover("t", history[:5]) == carryover
+    assert len(calls) == 1
+
+    # only the message that just left the window is summarized
+    carryover = manager.build_carryover("t", history[:6])
+    assert contents(carryover)[0] == "Summary of the earlier conversation: m0+m1 m2"
+    assert calls[-1] == ["m2"]
+
+    # a larger budget does not move the boundary back
+    manager.token_budget = 10
+    assert manager.build_carryover("t", history[:6]) == carryover
+    assert len(calls) == 2
+    manager.token_budget = 3
+
+    # editing the summarized history rebuilds the summary from scratch
+    edited = history[:2] + [{"role": "user", "content": "m2 edited"}] + history[3:6]
+    carryover = manager.build_carryover("t", edited)
+    assert calls[-1] == ["m0", "m1", "m2 edited"]
+    assert contents(carryover)[0] == "Summary of the earlier conversation: m0+m1+m2 edited"
+
+    # so does a history shorter than the boundary, and forget()
+    manager.build_carryover("t", history[:2])
+    assert manager.build_carryover("t", history[:4])[0]["content"].endswith(": m0")
+    manager.forget("t")
+    manager.build_carryover("t", history[:5])
+    assert calls[-1] == ["m0", "m1"]
+
+    # without a thread id nothing is memoized
+    manager.build_carryover(None, history[:5])
+    manager.build_carryover(None, history[:5])
+    assert calls[-2:] == [["m0", "m1"], ["m0", "m1"]]
+
+
+def test_autogen_stream_messages_become_tokens():
+    """Chunks autogen sends as StreamMessage reach the node stream as tokens"""
+    client_messages = pytest.importorskip("autogen.messages.client_messages")
+    from autogen.io.base import IOStream
+
+    class Inner:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, message):
+            self.sent.append(message)
+
+    inner = Inner()
+    with IOStream.set_default(inner):
+        with NodeMessageStream(None, "autogen") as stream, autogen_token_iostream():
+            tokens = []
+            stream.token = tokens.append
+            # what autogen.oai.client does for every streamed chunk
+            iostream = IOStream.get_default()
+            for chunk in ("It might", " be cloudy"):
+                iostream.send(client_messages.StreamMessage(content=chunk))
+            other = client_messages.UsageSummaryMessage()
+            iostream.send(other)
+    assert tokens == ["It might", " be cloudy"]
+    assert inner.sent == [other]
+
+
+def test_conversation_server_releases_thread_on_disconnect():
+    """A streaming client that disconnects does not keep its thread locked"""
+    messages = pytest.importorskip("langchain_core.messages")
+
+    class Graph:
+        def __init__(self):
+            self.closed = 0
+
+        async def astream(self, inputs, config, stream_mode):
+            try:
+                if "messages" in stream_mode:
+                    while True:
+                        yield "messages", (messages.AIMessageChunk(content="x" * 100_000), {})
+                        await asyncio.sleep(0.01)
+                yield "values", {"messages": [messages.AIMessage(content="hi")]}
+            finally:
+                self.closed += 1
+
+    async def run():
+        graph = Graph()
+        server = ConversationServer(graph, max_concurrency=1)
+        tcp_server = await server.serve(port=0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            async with ConversationClient(port=port) as client:
+                events = client.stream("1", message="hi")
+                # tokens beyond asyncio's 64 KiB default line limit
+                assert len((await events.__anext__())["token"]) == 100_000
+                await events.aclose()
+            for _ in range(100):
+                if graph.closed:
+                    break
+                await asyncio.sleep(0.01)
+            assert graph.closed == 1
+            assert server.metrics()["threads"] == 0 and server.metrics()["active"] == 0
+            async with ConversationClient(port=port) as client:
+                assert (await client.start("1", "hi"))["reply"] == "hi"
+
+    asyncio.run(run())
+
+
+def test_message_converter_follows_edits_and_removals():
+    """Messages edited or removed by id are converted again"""
+    messages = pytest.importorskip("langchain_core.messages")
+    add_messages = pytest.importorskip("langgraph.graph.message").add_messages
+    from agentFrameworks.message_cache import OpenAIMessageConverter
+
+    converter = OpenAIMessageConverter()
+    history = add_messages([], [
+        messages.HumanMessage(content="hello", id="h0"),
+        messages.HumanMessage(content="my number is 111", id="h1"),
+        messages.AIMessage(content="noted", id="a1"),
+    ])
+    assert [m["content"] for m in converter.convert("t", history)] == [
+        "hello", "my number is 111", "noted"]
+
+    # edit a message in the middle by id and append one
+    history = add_messages(history, [
+        messages.HumanMessage(content="my number is 222", id="h1"),
+        messages.HumanMessage(content="what is my number?", id="h3"),
+    ])
+    converted = converter.convert("t", history)
+    assert [m["content"] for m in converted] == [
+        "hello", "my number is 222", "noted", "what is my number?"]
+    assert converted == messages.convert_to_openai_messages(history)
+    assert converter.reused == 1
+
+    # remove a message in the middle by id
+    history = add_messages(history, [messages.RemoveMessage(id="h1")])
+    assert [m["content"] for m in converter.convert("t", history)] == [
+        "hello", "noted", "what is my number?"]
+
+    # unchanged history is not converted again
+    converted_before = converter.converted
+    converter.convert("t", history)
+    assert converter.converted == converted_before
+
+
 if __name__ == "__main__":
     test_crewai_agent()
     print("\n")
@@ -0,0 +1,90 @@
+"""
+Test script for the Workflow Parser
+
+This script checks that the incremental parser yields the same tools, nodes
+and edges as a full json.loads, regardless of how the input is chunked, and
+that it neither reads nor builds more of the document than it needs.
+"""
+
+import io
+import json
+import tracemalloc
+from workflow_parser import iter_workflow_items, parse_workflow
+
+
+def test_parse_workflow_with_comments():
+    """Test parsing json_data/workflow_v2.json, which contains // comments."""
+    for mode, chunk_size in (("r", 1), ("rb", 5), ("r", 4096)):
+        with open("json_data/workflow_v2.json", mode) as f:
+            workflow = parse_workflow(f, chunk_size=chunk_size)
+
+        assert workflow["metadata"]["workflow_id"] == "sales_lead_assignment_flow"
+        assert [tool["name"] for tool in workflow["tools"]] == [
+            "assign_lead_tool", "confirm_lead_tool"]
+        assert [node["id"] for node in workflow["nodes"]] == [
+            "supervisor", "assignment_agent", "confirmation_agent"]
+        assert len(workflow["edges"]) == 4
+
+
+def test_iter_workflow_items_matches_json_loads():
+    """Test that lazily yielded items equal the fully parsed document."""
+    with open("json_data/workflow_publish.json", "r") as f:
+        expected = json.load(f)
+
+    with open("json_data/workflow_publish.json", "rb") as f:
+        items = list(iter_workflow_items(f, chunk_size=7))
+
+    assert [item for kind, item in items if kind == "node"] == expected["nodes"]
+    assert [item for kind, item in items if kind == "edge"] == expected["edges"]
+    assert ("metadata", expected["workflow_metadata"]) in items
+
+
+def test_items_are_yielded_before_the_document_is_read():
+    """Test that the first node is yielded after reading only its chunks."""
+    document = json.dumps({
+        "nodes": [{"id": f"n{i}", "prompt": "x" * 1000} for i in range(100)],
+        "edges": [],
+    })
+    stream = io.StringIO(document)
+    items = iter_workflow_items(stream, chunk_size=4096)
+
+    assert next(items) == ("node", {"id": "n0", "prompt": "x" * 1000})
+    assert stream.tell() <= 4096
+    assert len(list(items)) == 99
+    assert stream.tell() == len(document)
+
+
+def test_layout_blobs_are_skipped():
+    """Test that unrelated keys are not materialized."""
+    document = json.dumps({
+        "layout": {"positions": [{"x": i, "y": i, "label": "]} //"} for i in range(20000)]},
+        "nodes": [{"id": "a", "escaped": "line\nbreak \"quoted\""}],
+        "edges": [{"source": "START", "target": "a"}],
+    })
+    stream = io.StringIO(document)
+    tracemalloc.start()
+    try:
+        items = list(iter_workflow_items(stream, chunk_size=16 * 1024))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert items == [
+        ("node", {"id": "a", "escaped": "line\nbreak \"quoted\""}),
+        ("edge", {"source": "START", "target": "a"}),
+    ]
+    # the layout blob is scanned chunk by chunk, never held or decoded whole
+    assert peak < len(document) / 4
+
+
+def test_comment_markers_inside_strings_are_kept():
+    """Test that only comments outside strings are stripped."""
+    document = """{
+        "workflow_id": "w", // trailing comment
+        /* block
+           comment */
+        "nodes": [{"id": "a", "url": "http://localhost/*path*/"}]
+    }"""
+    workflow = parse_workflow(document)
+    assert workflow["metadata"] == {"workflow_id": "w"}
+    assert workflow["nodes"] == [{"id": "a", "url": "http://localhost/*path*/"}]
@@ -0,0 +1,264 @@
+"""
+Tool Result Cache Module
+
+This module caches the results of deterministic tool calls. Agents often call
+the same lookup tool (user info, package details, search) with the same
+arguments several times within a turn and again on later turns; a cached
+tool answers those calls without running the tool again.
+
+The cache works below the framework decorator, so the same function can be
+exposed with `langchain_core.tools.tool` or `crewai.tools.tool`:
+
+    @tool
+    @cached_tool(ttl=600)
+    def get_user_info(phoneNumber: str) -> str:
+        ...
+
+Already decorated tools, or a whole tool list, can be wrapped with
+`cache_tools`. Tools with side effects (posting data, raising interrupts)
+must not be cached and are marked with `@no_cache`, which `cache_tools`
+respects:
+
+    tools = cache_tools([get_data, post_data], ttl=300)
+
+Calls are keyed on the tool name and its bound arguments, with defaults
+applied and strings stripped, so `f("x")`, `f(" x ")` and `f(query="x")` hit
+the same entry. Exceptions are never cached.
+
+Set TOOL_CACHE=off to disable caching everywhere, for example while debugging
+a tool.
+"""
+
+import asyncio
+import copy
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TTL = float(os.environ.get("TOOL_CACHE_TTL", "300"))
+DEFAULT_MAX_SIZE = int(os.environ.get("TOOL_CACHE_SIZE", "1024"))
+
+_NO_CACHE_ATTR = "__tool_cache_disabled__"
+_CACHE_ATTR = "tool_cache"
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Default argument normalization: strip surrounding whitespace of strings."""
+    return {name: value.strip() if isinstance(value, str) else value
+            for name, value in arguments.items()}
+
+
+def _enabled() -> bool:
+    return os.environ.get("TOOL_CACHE", "on").lower() != "off"
+
+
+class ToolResultCache:
+    """
+    LRU cache of the results of one tool, with a time-to-live per entry.
+
+    Args:
+        name: Tool name, reported in the statistics
+        ttl: Lifetime of an entry in seconds, None keeps entries until evicted
+        max_size: Maximum number of cached results
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for a key, dropping the entry if it expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hits, misses, hit rate, evictions and number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tool": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
+
+
+_caches: List[ToolResultCache] = []
+_caches_lock = threading.Lock()
+
+
+def tool_cache_stats() -> List[Dict[str, Any]]:
+    """Return the statistics of every tool cache created in this process."""
+    with _caches_lock:
+        return [cache.stats() for cache in _caches]
+
+
+def clear_tool_caches() -> None:
+    """Drop the cached results of every tool."""
+    with _caches_lock:
+        for cache in _caches:
+            cache.clear()
+
+
+def no_cache(func: Callable) -> Callable:
+    """Mark a tool function as side-effecting so it is never cached."""
+    setattr(func, _NO_CACHE_ATTR, True)
+    return func
+
+
+def is_cacheable(tool: Any) -> bool:
+    """Return False if a tool, or the function behind it, is marked with no_cache."""
+    func = getattr(tool, "func", None) or tool
+    return not (getattr(tool, _NO_CACHE_ATTR, False) or getattr(func, _NO_CACHE_ATTR, False))
+
+
+def _make_key(name: str, signature: inspect.Signature,
+              normalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+              args: tuple, kwargs: dict) -> Optional[str]:
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        # Let the call itself raise the error
+        return None
+    bound.apply_defaults()
+    arguments = normalize(dict(bound.arguments))
+    try:
+        return name + ":" + json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+    except TypeError:
+        # Arguments that are not JSON serializable are not cached
+        return None
+
+
+def cached_tool(ttl: Optional[float] = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE,
+                normalize: Callable[[Dict[str, Any]], Dict[str, Any]] = normalize_arguments,
+                name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorator caching the results of a deterministic tool function.
+
+    Apply it below the framework's tool decorator, so the framework still sees
+    the original name, signature and docstring. Sync and async functions are
+    supported.
+
+    Args:
+        ttl: Lifetime of a cached result in seconds, None keeps results until evicted
+        max_size: Maximum number of cached results of this tool
+        normalize: Maps the bound arguments (defaults applied) to the values
+            used in the cache key
+        name: Cache name, defaults to the function's qualified name
+
+    Returns:
+        Decorator returning the caching function; its ToolResultCache is
+        available as `tool_cache`
+    """
+    def decorator(func: Callable) -> Callable:
+        if getattr(func, _NO_CACHE_ATTR, False):
+            raise ValueError(f"Tool {func.__name__} is marked with no_cache")
+        cache_name = name or func.__qualname__
+        cache = ToolResultCache(cache_name, ttl=ttl, max_size=max_size)
+        with _caches_lock:
+            _caches.append(cache)
+        signature = inspect.signature(func)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = _make_key(cache_name, signature, normalize, args, kwargs) if _enabled() else None
+                if key is None:
+                    return await func(*args, **kwargs)
+                found, value = cache.get(key)
+                if found:
+                    return value
+                value = await func(*args, **kwargs)
+                cache.set(key, value)
+                return value
+
+            wrapper = async_wrapper
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = _make_key(cache_name, signature, normalize, args, kwargs) if _enabled() else None
+                if key is None:
+                    return func(*args, **kwargs)
+                found, value = cache.get(key)
+                if found:
+                    return value
+                value = func(*args, **kwargs)
+                cache.set(key, value)
+                return value
+
+        setattr(wrapper, _CACHE_ATTR, cache)
+        return wrapper
+
+    return decorator
+
+
+def cache_tools(tools: Iterable[Any], **options: Any) -> List[Any]:
+    """
+    Return the tools with caching applied to every tool not marked no_cache.
+
+    Plain functions are wrapped with cached_tool. LangChain and CrewAI tool
+    objects are copied with their `func` (and LangChain's `coroutine`)
+    replaced by the caching version, so the originals are left unchanged.
+
+    Args:
+        tools: Tool functions or framework tool objects
+        **options: Arguments passed to cached_tool
+
+    Returns:
+        List of tools in the same order
+    """
+    cached = []
+    for tool in tools:
+        if not is_cacheable(tool):
+            cached.append(tool)
+            continue
+        if not hasattr(tool, "func"):
+            cached.append(cached_tool(**options)(tool))
+            continue
+        tool_options = {"name": getattr(tool, "name", None), **options}
+        wrapped = copy.copy(tool)
+        if tool.func is not None and not hasattr(tool.func, _CACHE_ATTR):
+            wrapped.func = cached_tool(**tool_options)(tool.func)
+        coroutine = getattr(tool, "coroutine", None)
+        if coroutine is not None and not hasattr(coroutine, _CACHE_ATTR):
+            wrapped.coroutine = cached_tool(**tool_options)(coroutine)
+        cached.append(wrapped)
+    return cached
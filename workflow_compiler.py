@@ -0,0 +1,322 @@
+"""
+Workflow Compiler Module
+
+This module compiles workflow specs (see json_data/workflow_v2.json) directly
+into LangGraph graphs in the current process, instead of generating Python
+source and running it in a separate process.
+
+- criteria.tools become LangChain tools calling the configured HTTP API
+- agent_node nodes become create_react_agent agents with their tools
+- decision_node nodes pick the next node among their conditional targets
+- interrupt.before / interrupt.after flags map to interrupt_before/after
+- a non-conditional edge with a list of targets fans out to parallel
+  branches, an edge with a list of sources joins them; branch deltas are
+  merged in the order of the join's source list (see parallel_branches)
+
+Compiled graphs are cached by workflow_id and version, so publishing the same
+workflow again, or serving requests for it, skips compilation entirely.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Annotated, Any, Callable, Dict, List, Tuple
+
+import requests
+from langchain_core.messages import SystemMessage
+from langchain_core.tools import StructuredTool
+from langchain_openai import ChatOpenAI
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import create_react_agent
+from pydantic import Field, create_model
+
+from agent_factory import config_hash
+from llm_cache import cached_client_kwargs
+from parallel_branches import branch, join_branches, merge_branch_messages
+from workflow_parser import parse_workflow
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+}
+
+
+class WorkflowState(MessagesState):
+    """State shared by the nodes of a compiled workflow."""
+    next: str
+    branch_messages: Annotated[dict, merge_branch_messages]
+
+
+def workflow_key(spec: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Return the (workflow_id, version) cache key of a workflow spec.
+
+    Specs without an explicit version are versioned by the hash of their
+    content, so an edited spec never reuses a stale compiled graph.
+    """
+    metadata = spec.get("metadata") or spec.get("workflow_metadata") or {}
+    workflow_id = spec.get("workflow_id") or metadata.get("workflow_id")
+    if not workflow_id:
+        raise ValueError("Workflow spec without workflow_id")
+    version = spec.get("version") or metadata.get("version") or config_hash(spec)
+    return str(workflow_id), str(version)
+
+
+def _graph_section(spec: Dict[str, Any], name: str) -> List[Dict[str, Any]]:
+    graph = spec.get("criteria", {}).get("graph", {})
+    return graph.get(name) or spec.get(name) or []
+
+
+def _spec_tools(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return spec.get("criteria", {}).get("tools") or spec.get("tools") or []
+
+
+def build_api_tool(tool_spec: Dict[str, Any]) -> StructuredTool:
+    """
+    Build a LangChain tool that calls the HTTP API described by a tool spec.
+
+    Args:
+        tool_spec: Entry of criteria.tools with type "API"
+
+    Returns:
+        A StructuredTool with one argument per input parameter
+    """
+    config = tool_spec.get("config", {})
+    method = config.get("method", "GET").upper()
+    url = config["url"]
+    retry_attempts = max(1, int(config.get("retry_attempts", 1)))
+    parameters = config.get("input_parameters", {})
+
+    fields = {}
+    for param, param_spec in parameters.items():
+        param_type = _JSON_TYPES.get(param_spec.get("type", "string"), str)
+        default = ... if param_spec.get("required") else None
+        fields[param] = (param_type, Field(default, description=param_spec.get("description", "")))
+    args_schema = create_model(f"{tool_spec['name']}_args", **fields)
+
+    headers = dict(config.get("headers", {}))
+    security = config.get("security", {})
+    if security.get("is_protected"):
+        auth = security.get("auth", {}).get("config", {})
+        key_value = auth.get("key_value") or os.environ.get(auth.get("key_identifier", ""))
+        if auth.get("header_name") and key_value:
+            headers[auth["header_name"]] = key_value
+
+    def call_api(**kwargs: Any) -> str:
+        last_error = None
+        for _ in range(retry_attempts):
+            try:
+                if method == "GET":
+                    response = requests.get(url, params=kwargs, headers=headers, timeout=30)
+                else:
+                    response = requests.request(method, url, json=kwargs, headers=headers, timeout=30)
+                response.raise_for_status()
+                return response.text
+            except requests.RequestException as e:
+                last_error = e
+        return f"Error calling {tool_spec['name']}: {last_error}"
+
+    return StructuredTool.from_function(
+        func=call_api,
+        name=tool_spec["name"],
+        description=tool_spec.get("description", ""),
+        args_schema=args_schema,
+        return_direct=bool(config.get("return_direct", False)),
+    )
+
+
+def _node_model(node: Dict[str, Any]) -> ChatOpenAI:
+    llm = node.get("llm", {})
+    return ChatOpenAI(
+        model=llm.get("model_name", "gpt-4o-mini"),
+        temperature=llm.get("temperature", 0),
+        timeout=30,
+        max_retries=node.get("retry_attempts", 2),
+        **cached_client_kwargs(),
+    )
+
+
+def _agent_node(node: Dict[str, Any], tools: Dict[str, StructuredTool]) -> Callable:
+    try:
+        node_tools = [tools[name] for name in node.get("tools", [])]
+    except KeyError as e:
+        raise ValueError(f"Node {node['id']} uses unknown tool {e.args[0]}") from e
+    react_agent = create_react_agent(
+        _node_model(node), tools=node_tools, prompt=node.get("prompt", ""))
+
+    def call_agent(state: WorkflowState):
+        messages = state["messages"]
+        result = react_agent.invoke({"messages": messages})
+        # Only return the messages produced by this node
+        return {"messages": result["messages"][len(messages):]}
+
+    return call_agent
+
+
+def _decision_node(node: Dict[str, Any], targets: List[str]) -> Callable:
+    model = _node_model(node)
+    instructions = (
+        f"{node.get('prompt', '')}\n"
+        f"Reply with exactly one of: {', '.join(targets)}."
+    )
+
+    def decide(state: WorkflowState):
+        response = model.invoke([SystemMessage(content=instructions)] + state["messages"])
+        choice = response.content.strip()
+        # Fall back to a substring match, then to END
+        if choice not in targets:
+            choice = next((t for t in targets if t in choice), "END")
+        return {"next": choice}
+
+    return decide
+
+
+def compile_workflow(spec: Dict[str, Any], checkpointer: Any = None):
+    """
+    Compile a workflow spec into a LangGraph graph.
+
+    Args:
+        spec: Workflow spec (raw spec or output of parse_workflow)
+        checkpointer: Optional checkpointer passed to compile
+
+    Returns:
+        The compiled graph
+
+    Raises:
+        ValueError: If the spec references unknown nodes or tools
+    """
+    tools = {}
+    for tool_spec in _spec_tools(spec):
+        if tool_spec.get("type", "").upper() != "API":
+            raise ValueError(f"Unsupported tool type: {tool_spec.get('type')}")
+        tools[tool_spec["name"]] = build_api_tool(tool_spec)
+
+    nodes = {node["id"]: node for node in _graph_section(spec, "nodes")}
+    edges = _graph_section(spec, "edges")
+    conditional_targets = {
+        edge["source"]: edge["target"] for edge in edges if edge.get("conditional")}
+    # Nodes whose output is merged by a join are run as branches
+    joined = {source for edge in edges if isinstance(edge["source"], list)
+              for source in edge["source"]}
+
+    builder = StateGraph(WorkflowState)
+    interrupt_before, interrupt_after = [], []
+    for node_id, node in nodes.items():
+        if node.get("function") == "decision_node":
+            targets = conditional_targets.get(node_id, [])
+            builder.add_node(node_id, _decision_node(node, targets))
+        elif node_id in joined:
+            builder.add_node(node_id, branch(node_id, _agent_node(node, tools)))
+        else:
+            builder.add_node(node_id, _agent_node(node, tools))
+        interrupt = node.get("interrupt", {})
+        if interrupt.get("before", {}).get("enabled"):
+            interrupt_before.append(node_id)
+        if interrupt.get("after", {}).get("enabled"):
+            interrupt_after.append(node_id)
+
+    def endpoint(name: str) -> str:
+        if name == "START":
+            return START
+        if name == "END":
+            return END
+        if name not in nodes:
+            raise ValueError(f"Edge references unknown node: {name}")
+        return name
+
+    for edge in edges:
+        if isinstance(edge["source"], list):
+            # Join: wait for every branch, then merge their deltas in order
+            sources = [endpoint(source) for source in edge["source"]]
+            join_node = f"{edge['target']}_join"
+            builder.add_node(join_node, join_branches(sources))
+            builder.add_edge(sources, join_node)
+            builder.add_edge(join_node, endpoint(edge["target"]))
+            continue
+        source = endpoint(edge["source"])
+        if edge.get("conditional"):
+            path_map = {target: endpoint(target) for target in edge["target"]}
+            # decision nodes fall back to END when the reply names no target
+            path_map.setdefault("END", END)
+            builder.add_conditional_edges(source, lambda state: state["next"], path_map)
+        elif isinstance(edge["target"], list):
+            # Fan out: every target runs in the same step
+            for target in edge["target"]:
+                builder.add_edge(source, endpoint(target))
+        else:
+            builder.add_edge(source, endpoint(edge["target"]))
+
+    return builder.compile(
+        checkpointer=checkpointer,
+        interrupt_before=interrupt_before,
+        interrupt_after=interrupt_after,
+    )
+
+
+class CompiledGraphCache:
+    """
+    LRU cache of compiled workflow graphs.
+
+    Graphs are keyed by (workflow_id, version) and the checkpointer they were
+    compiled with. The checkpointer is kept alive by its cache entry, so its
+    id cannot be reused by another checkpointer while the entry exists.
+    Compilation happens outside the lock; if two threads miss on the same
+    key at once, the first stored graph wins.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # key -> (checkpointer, graph)
+        self._graphs: "OrderedDict[Tuple, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compile(self, spec: Dict[str, Any], checkpointer: Any = None):
+        """Return the compiled graph for spec, compiling it on a miss."""
+        key = workflow_key(spec) + (id(checkpointer),)
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is not None:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        graph = compile_workflow(spec, checkpointer=checkpointer)
+
+        with self._lock:
+            entry = self._graphs.setdefault(key, (checkpointer, graph))
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+        return entry[1]
+
+    def invalidate(self, workflow_id: str) -> None:
+        """Drop every cached version of a workflow."""
+        with self._lock:
+            for key in [k for k in self._graphs if k[0] == workflow_id]:
+                del self._graphs[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {"size": len(self._graphs), "hits": self.hits, "misses": self.misses}
+
+
+# Shared cache used by get_compiled_workflow
+compiled_graph_cache = CompiledGraphCache()
+
+
+def get_compiled_workflow(spec: Dict[str, Any], checkpointer: Any = None):
+    """Return the compiled graph of a workflow spec from the shared cache."""
+    return compiled_graph_cache.get_or_compile(spec, checkpointer=checkpointer)
+
+
+def load_workflow(path: str, checkpointer: Any = None):
+    """Parse a workflow spec file and return its compiled graph."""
+    with open(path, "r", encoding="utf-8") as f:
+        spec = parse_workflow(f)
+    return get_compiled_workflow(spec, checkpointer=checkpointer)
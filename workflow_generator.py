@@ -0,0 +1,212 @@
+"""
+Workflow Generator Module
+
+This module generates code for every agent node of a workflow spec and keeps a
+manifest of the generated per-node fragments keyed by the hash of each node's
+configuration. When a new version of the spec is generated only the nodes
+whose hash changed are rendered again, the other fragments are reused as is
+and spliced back into the output in the spec's node order.
+
+Fragments are rewritten so they can share one module: the names a fragment
+defines at module level get the node id as suffix (agent -> agent_<node_id>),
+and its top-level imports are hoisted into one import block at the top of
+the script. `from m import n` becomes `import m` with n used as m.n, so
+frameworks exporting the same name (e.g. Agent) do not shadow each other.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent_factory import config_hash, generate_agent_code
+
+
+@dataclass
+class NodeFragment:
+    """Generated code for a single workflow node, without its imports."""
+    node_id: str
+    config_hash: str
+    code: str
+    imports: Tuple[str, ...] = ()
+
+
+def node_suffix(node_id: str) -> str:
+    """Return the identifier suffix used for the names of a node's fragment."""
+    return re.sub(r"\W", "_", node_id)
+
+
+def _rename(code: str, tree: ast.AST, names: Dict[str, str]) -> str:
+    # Rename identifiers at the positions ast reports; strings, comments,
+    # attributes and keyword arguments are left alone
+    edits = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in names:
+            edits.append((node.lineno, node.col_offset, node.id))
+        elif isinstance(node, ast.arg) and node.arg in names:
+            edits.append((node.lineno, node.col_offset, node.arg))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) \
+                and node.name in names and not node.decorator_list:
+            edits.append((node.lineno, None, node.name))
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            edits.extend((node.lineno, None, name) for name in node.names if name in names)
+
+    # ast offsets count UTF-8 bytes
+    lines = [line.encode("utf-8") for line in code.splitlines(keepends=True)]
+    for lineno, col, name in sorted(edits, reverse=True):
+        line = lines[lineno - 1]
+        old = name.encode("utf-8")
+        if col is None:
+            col = re.search(rb"\b%s\b" % re.escape(old), line).start()
+        lines[lineno - 1] = line[:col] + names[name].encode("utf-8") + line[col + len(old):]
+    return b"".join(lines).decode("utf-8")
+
+
+def split_fragment(code: str, suffix: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Rewrite generated agent code so it can share a module with other nodes.
+
+    Args:
+        code: Code generated for one node
+        suffix: Suffix appended to the names the code defines at module level
+
+    Returns:
+        Tuple of the rewritten code without its top-level imports and the
+        import statements it needs
+    """
+    tree = ast.parse(code)
+    names: Dict[str, str] = {}
+    imports: List[str] = []
+    import_lines = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imports.extend(f"import {ast.unparse(alias)}" for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module != "__future__":
+            imports.append(f"import {node.module}")
+            for alias in node.names:
+                names[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+        else:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                # decorated functions are tools, whose names the LLM sees
+                if not node.decorator_list:
+                    names[node.name] = f"{node.name}_{suffix}"
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        names[target.id] = f"{target.id}_{suffix}"
+            continue
+        import_lines.update(range(node.lineno, node.end_lineno + 1))
+
+    lines = _rename(code, tree, names).splitlines(keepends=True)
+    body = "".join(line for number, line in enumerate(lines, 1) if number not in import_lines)
+    return body, tuple(imports)
+
+
+def workflow_nodes(workflow: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Return the node configs of a workflow spec.
+
+    Accepts the raw spec shape (criteria.graph.nodes), the publish shape
+    (top-level nodes) and the output of workflow_parser.parse_workflow.
+    """
+    graph = workflow.get("criteria", {}).get("graph", {})
+    return graph.get("nodes") or workflow.get("nodes") or []
+
+
+def node_agent_config(node: Dict[str, Any], default_framework: str) -> Dict[str, Any]:
+    """
+    Convert a workflow node into an agent configuration for AgentFactory.
+
+    Args:
+        node: Node config from the workflow spec
+        default_framework: Framework used when the node does not specify one
+
+    Returns:
+        Dictionary containing agent configuration
+    """
+    llm = node.get("llm", {})
+    config = {
+        "framework": node.get("framework", default_framework),
+        "role": node.get("name", node.get("id", "")),
+        "systemPrompt": node.get("prompt", ""),
+        "expectedOutput": node.get("expectedOutput", ""),
+        "tools": node.get("tools", []),
+    }
+    if llm.get("model_name"):
+        config["model"] = llm["model_name"]
+    return config
+
+
+class IncrementalWorkflowGenerator:
+    """
+    Generate workflow code, re-rendering only the nodes that changed.
+
+    The manifest maps node ids to their last generated NodeFragment. It is
+    kept across calls to generate, so the instance should live as long as the
+    editing session of a workflow.
+    """
+
+    def __init__(self, default_framework: str = "crewai"):
+        self.default_framework = default_framework
+        self.manifest: Dict[str, NodeFragment] = {}
+        self.last_regenerated: List[str] = []
+
+    def _render(self, node_id: str, node_hash: str, node: Dict[str, Any]) -> NodeFragment:
+        agent_config = node_agent_config(node, self.default_framework)
+        code, imports = split_fragment(generate_agent_code(agent_config), node_suffix(node_id))
+        code = f"# === node: {node_id} ({node_hash[:12]}) ===" + code
+        return NodeFragment(node_id=node_id, config_hash=node_hash, code=code, imports=imports)
+
+    def generate(self, workflow: Dict[str, Any]) -> str:
+        """
+        Generate code for every node of the workflow.
+
+        Args:
+            workflow: Workflow spec
+
+        Returns:
+            String representation of the generated workflow code
+
+        Raises:
+            ValueError: If a node id is missing or duplicated, two node ids
+                map to the same name, or the framework is not supported
+        """
+        manifest: Dict[str, NodeFragment] = {}
+        suffixes: Dict[str, str] = {}
+        regenerated: List[str] = []
+
+        for node in workflow_nodes(workflow):
+            node_id = node.get("id")
+            if not node_id:
+                raise ValueError("Workflow node without id")
+            if node_id in manifest:
+                raise ValueError(f"Duplicate workflow node id: {node_id}")
+            suffix = node_suffix(node_id)
+            if suffix in suffixes:
+                raise ValueError(
+                    f"Workflow node ids {suffixes[suffix]} and {node_id} map to the same name")
+            suffixes[suffix] = node_id
+            node_hash = config_hash(node)
+            fragment = self.manifest.get(node_id)
+            if fragment is None or fragment.config_hash != node_hash:
+                fragment = self._render(node_id, node_hash, node)
+                regenerated.append(node_id)
+            manifest[node_id] = fragment
+
+        # Nodes removed from the spec are dropped from the manifest
+        self.manifest = manifest
+        self.last_regenerated = regenerated
+        return self.output()
+
+    def output(self) -> str:
+        """Return the current workflow code assembled from the manifest."""
+        imports = dict.fromkeys(
+            line for fragment in self.manifest.values() for line in fragment.imports)
+        header = "\n".join(imports) + "\n\n" if imports else ""
+        return header + "\n".join(fragment.code for fragment in self.manifest.values())
+
+    def fragment(self, node_id: str) -> Optional[str]:
+        """Return the generated code of a single node, if present."""
+        fragment = self.manifest.get(node_id)
+        return fragment.code if fragment else None
@@ -0,0 +1,333 @@
+"""
+Workflow Parser Module
+
+This module implements an incremental parser for workflow documents (see
+json_data/workflow_v2.json and json_data/workflow_publish.json).
+
+The document is read from a stream in fixed size chunks. The parser walks
+the top-level object, criteria and criteria.graph itself and hands every
+tool, graph node and edge to json.JSONDecoder.raw_decode, the C parser of
+the standard library, as soon as it is in the buffer; each item is yielded
+before the rest of the document is read. Everything else (layout blobs, UI
+metadata, ...) is skipped by scanning its brackets without building it, and
+consumed input is dropped from the buffer. Peak memory therefore depends on
+the largest single item and the chunk size, not on the document size.
+
+// line and /* block */ comments are accepted, as used in the sample specs.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterator, TextIO, Tuple, Union
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Strings are matched too, so comment markers inside strings (URLs) are kept
+_COMMENT_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|(//[^\n]*|/\*.*?\*/)', re.DOTALL)
+_WS_RE = re.compile(r'(?:\s+|//[^\n]*\n|/\*.*?\*/)*', re.DOTALL)
+_COMMENT_TOKEN_RE = re.compile(r'//[^\n]*\n|/\*.*?\*/', re.DOTALL)
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_STRING_RE = re.compile(_STRING, re.DOTALL)
+_SCALAR_RE = re.compile(r'[^\s,\]}/]+')
+# Small containers without nested containers or comments, matched in one
+# step. Repetitions are bounded, the regex engine keeps a backtracking entry
+# for each one.
+_PLAIN = r'[^\[\]{}"/]*'
+_FLAT = rf'\{{{_PLAIN}(?:{_STRING}{_PLAIN}){{0,64}}\}}|\[{_PLAIN}(?:{_STRING}{_PLAIN}){{0,64}}\]'
+_FLAT_RE = re.compile(_FLAT, re.DOTALL)
+# A run of strings and flat containers inside a container
+_SKIP_RE = re.compile(rf'{_PLAIN}(?:(?:{_STRING}|{_FLAT}){_PLAIN}){{0,64}}', re.DOTALL)
+
+Source = Union[str, bytes, TextIO, Dict[str, Any]]
+
+
+def strip_comments(text: str) -> str:
+    """Remove // and /* */ comments that are outside JSON strings."""
+    parts = []
+    last = 0
+    for match in _COMMENT_RE.finditer(text):
+        if match.lastindex:
+            parts.append(text[last:match.start()])
+            last = match.end()
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+class _Reader:
+    """Buffered cursor over a JSON text stream."""
+
+    def __init__(self, source: Union[str, bytes, TextIO], chunk_size: int):
+        self._stream = None
+        self._decoder = None
+        self._chunk_size = chunk_size
+        self._json = json.JSONDecoder()
+        self.pos = 0
+        self.eof = True
+        # Values consumed so far, tells keys() whether the caller read a value
+        self.consumed = 0
+        if hasattr(source, "read"):
+            self._stream = source
+            self.buf = ""
+            self.eof = False
+        elif isinstance(source, bytes):
+            self.buf = source.decode("utf-8-sig")
+        else:
+            self.buf = source
+
+    def _fill(self) -> bool:
+        """Drop the consumed input and read the next chunk; False at end of input."""
+        if self.eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            text = self._decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        self.eof = not chunk
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid workflow document: {message}")
+
+    def peek(self) -> str:
+        """Skip whitespace and comments and return the next character, "" at the end."""
+        char = self.buf[self.pos:self.pos + 1]
+        if char and char not in " \t\n\r/":
+            return char
+        while True:
+            self.pos = _WS_RE.match(self.buf, self.pos).end()
+            # a "/" left over may be a comment that continues in the next chunk
+            if self.pos < len(self.buf) and self.buf[self.pos] != "/":
+                return self.buf[self.pos]
+            if not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"expected {char!r} at {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def _string(self) -> str:
+        while True:
+            match = _STRING_RE.match(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                token = match.group()
+                return json.loads(token) if "\\" in token else token[1:-1]
+            if not self._fill():
+                raise self._error("unterminated string")
+
+    def _value_end(self, keep: bool = True) -> int:
+        """Return the end of the value at pos, reading more input as needed.
+
+        With keep=False the part of the value already scanned is dropped
+        from the buffer, for values that are skipped.
+        """
+        first = self.peek()
+        if first not in ("[", "{"):
+            regex = _STRING_RE if first == '"' else _SCALAR_RE
+            while True:
+                match = regex.match(self.buf, self.pos)
+                if match is not None and (match.end() < len(self.buf) or self.eof):
+                    return match.end()
+                if not self._fill():
+                    raise self._error("unexpected end of input")
+        match = _FLAT_RE.match(self.buf, self.pos)
+        if match is not None:
+            return match.end()
+        depth = 1
+        scan = self.pos + 1
+        while True:
+            scan = _SKIP_RE.match(self.buf, scan).end()
+            char = self.buf[scan:scan + 1]
+            match = None
+            if char == '"':
+                match = _STRING_RE.match(self.buf, scan)
+            elif char in ("[", "{"):
+                match = _FLAT_RE.match(self.buf, scan)
+            elif char == "/":
+                match = _COMMENT_TOKEN_RE.match(self.buf, scan)
+            if match is not None:
+                scan = match.end()
+                continue
+            if char in ("[", "{"):
+                depth += 1
+                scan += 1
+                continue
+            if char in ("]", "}"):
+                depth -= 1
+                scan += 1
+                if depth == 0:
+                    return scan
+                continue
+            # end of the buffer, a cut-off string or a cut-off comment
+            if not keep:
+                self.pos = scan
+            scan -= self.pos
+            if not self._fill():
+                raise self._error("unexpected end of input")
+            scan += self.pos
+
+    def value(self) -> Any:
+        """Decode the value at pos."""
+        # Numbers may continue in the next chunk even when they decode
+        if self.peek() in ("{", "[", '"'):
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    self.consumed += 1
+                    return value
+            except json.JSONDecodeError:
+                pass
+        # The value continues in the next chunk, contains comments or is a number
+        end = self._value_end()
+        text = self.buf[self.pos:end]
+        self.pos = end
+        self.consumed += 1
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return json.loads(strip_comments(text))
+
+    def skip(self) -> None:
+        """Skip the value at pos without building it."""
+        self.pos = self._value_end(keep=False)
+        self.consumed += 1
+
+    def keys(self) -> Iterator[str]:
+        """Yield the keys of the object at pos; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() != "}":
+            while True:
+                if self.peek() != '"':
+                    raise self._error("expected an object key")
+                key = self._string()
+                self.expect(":")
+                consumed = self.consumed
+                yield key
+                if self.consumed == consumed:
+                    self.skip()
+                if self.peek() != ",":
+                    break
+                self.pos += 1
+        self.expect("}")
+        self.consumed += 1
+
+    def items(self) -> Iterator[None]:
+        """Step through the array at pos; the caller consumes each item."""
+        self.expect("[")
+        if self.peek() != "]":
+            while True:
+                yield None
+                if self.peek() != ",":
+                    break
+                self.pos += 1
+        self.expect("]")
+        self.consumed += 1
+
+
+def _stream_items(reader: _Reader) -> Iterator[Tuple[str, Any]]:
+    def array(kind: str) -> Iterator[Tuple[str, Any]]:
+        if reader.peek() != "[":
+            return
+        for _ in reader.items():
+            yield kind, reader.value()
+
+    if reader.peek() != "{":
+        return
+    for key in reader.keys():
+        if key == "workflow_metadata":
+            value = reader.value()
+            if isinstance(value, dict):
+                yield "metadata", value
+        elif key == "criteria" and reader.peek() == "{":
+            for section in reader.keys():
+                if section == "tools":
+                    yield from array("tool")
+                elif section == "graph" and reader.peek() == "{":
+                    for graph_key in reader.keys():
+                        if graph_key in ("nodes", "edges"):
+                            yield from array(graph_key[:-1])
+        elif key in ("nodes", "edges"):
+            yield from array(key[:-1])
+        elif reader.peek() not in ("{", "["):
+            yield "metadata", {key: reader.value()}
+
+
+def _items(value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _document_items(document: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    for key, value in document.items():
+        if key == "workflow_metadata":
+            if isinstance(value, dict):
+                yield "metadata", value
+        elif key == "criteria" and isinstance(value, dict):
+            for section, section_value in value.items():
+                if section == "tools":
+                    for tool in _items(section_value):
+                        yield "tool", tool
+                elif section == "graph" and isinstance(section_value, dict):
+                    for graph_key, graph_value in section_value.items():
+                        if graph_key in ("nodes", "edges"):
+                            for item in _items(graph_value):
+                                yield graph_key[:-1], item
+        elif key in ("nodes", "edges"):
+            for item in _items(value):
+                yield key[:-1], item
+        elif not isinstance(value, (dict, list)):
+            yield "metadata", {key: value}
+
+
+def iter_workflow_items(source: Source,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield the tools, nodes and edges of a workflow document as they are read.
+
+    Top-level scalar fields (workflow_id, name, version, ...) and the
+    workflow_metadata object are yielded as "metadata" items. Tools, nodes
+    and edges are read from criteria.tools and criteria.graph (raw specs) or
+    from top-level nodes and edges (published specs).
+
+    Args:
+        source: JSON document as a string, bytes or readable stream, or an
+            already decoded document
+        chunk_size: Number of characters (bytes for binary streams) read per call
+
+    Yields:
+        (kind, config) tuples where kind is tool, node, edge or metadata
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if isinstance(source, dict):
+        return _document_items(source)
+    return _stream_items(_Reader(source, chunk_size))
+
+
+def parse_workflow(source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Parse a workflow document into its metadata, tools, nodes and edges.
+
+    Args:
+        source: JSON document as a string, bytes or readable stream, or an
+            already decoded document
+        chunk_size: Number of characters (bytes for binary streams) read per call
+
+    Returns:
+        Dictionary with metadata, tools, nodes and edges keys
+    """
+    workflow: Dict[str, Any] = {"metadata": {}, "tools": [], "nodes": [], "edges": []}
+    for kind, item in iter_workflow_items(source, chunk_size):
+        if kind == "metadata":
+            workflow["metadata"].update(item)
+        else:
+            workflow[kind + "s"].append(item)
+    return workflow